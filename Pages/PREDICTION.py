@@ -1,16 +1,24 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import base64
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout
-from PIL import Image, ImageEnhance
-import cv2
-import numpy as np
+import json
 import os
+import sys
+import urllib.error
+
+# Make the shared modules in the project folder importable from the Pages folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assets import BACKGROUND_MAX_SIDE, get_base64_image
+from chat_history import chat_box
+from chatbot import generate_response
+from cnn_model import CNN_MODEL_PATH
+from feature_chart import feature_chart_spec
+from image_decode import DISPLAY_MAX_SIDE, decode_image, display_thumbnail
+from image_quality import QUALITY_MESSAGES
+from lazy_imports import import_report
+from prediction_engine import load_engine
+from prediction_service import request_batch_prediction, request_health, request_prediction
+from result_cache import load_result_cache, prediction_key
 
 st.markdown(
     "<div style='text-align: center;'><h1 style='color:Lime;'>SICKLE CELL PREDICTION</h1></div>",
@@ -24,79 +32,71 @@ st.markdown('''       **Note:** Ensure the image is clear and for accurate predi
 file_path_not_sickle = 'C:/Users/dell/Downloads/Sickle-Cell-Image-main/Sickle-Cell-Image-main/image_features_NOTSICKLE.csv'  # Update with the correct path
 file_path_sickle = 'C:/Users/dell/Downloads/Sickle-Cell-Image-main/Sickle-Cell-Image-main/image_features_SICKLE.csv'  # Update with the correct path
 
-data_not_sickle = pd.read_csv(file_path_not_sickle)
-data_sickle = pd.read_csv(file_path_sickle)
-data_combined = pd.concat([data_not_sickle, data_sickle])
-
-# Prepare data for training and testing
-features = ['Sickled Cells (%)', 'Normocytes (%)', 'Target Cells (%)', 'Reticulocytes (%)']
-X = data_combined[features]
-y = data_combined['Sickle Cell'].apply(lambda x: 1 if x == 'YES' else 0)  # Encode 'YES' as 1 and 'NO' as 0
-
-# Split data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.25, random_state=42)
-
-# Train a CNN Classifier
-clf = RandomForestClassifier(random_state=42)
-clf.fit(X_train, y_train)
-
-# Function to predict sickle cell status based on filename
-def predict_sickle_cell(filename):
-    row = data_combined[data_combined['Filename'] == filename]
-    if row.empty:
-        return "Filename not found in the dataset. Please ensure the uploaded image matches the dataset."
-    sickle_cell_value = row['Sickle Cell'].values[0]
-    return 'SICKLE CELL' if sickle_cell_value == 'YES' else 'NOT SICKLE CELL'
-
-# Function to evaluate sickle cell anemia based on feature thresholds
-def evaluate_sickle_cell(data):
-    sickle_cell_detected = False
-    reasons = []
-
-    if data["Sickled Cells (%)"] >= 5:
-        sickle_cell_detected = True
-        reasons.append("Sickled Cells Percentage is high")
-
-    if data["Target Cells (%)"] <= 15:
-        sickle_cell_detected = True
-        reasons.append("Target Cells Percentage is low")
-
-    if data["Normocytes (%)"] <= 80:
-        sickle_cell_detected = True
-        reasons.append("Normocytes Percentage is low")
-
-    if data["Reticulocytes (%)"] >= 10:
-        sickle_cell_detected = True
-        reasons.append("Reticulocytes Percentage is high")
-
-    return sickle_cell_detected, reasons
-
-# Function to plot the feature percentages as a bar graph
-def plot_features(row):
-    features = ['Sickled Cells (%)', 'Normocytes (%)', 'Target Cells (%)', 'Reticulocytes (%)']
-    values = row[features].values.flatten()
-    
-    plt.figure(figsize=(8, 5))
-    plt.barh(features, values, color=['red', 'blue', 'green', 'purple'])
-    plt.title("Cell Features Percentage")
-    plt.xlabel("Percentage")
-    plt.ylabel("Features")
-    plt.xlim(0, 100)
-    plt.tight_layout()
-    st.pyplot(plt)
-
-# Function to calculate the brightness of the image
-def calculate_brightness(image):
-    grayscale_image = image.convert("L")  # Convert to grayscale
-    pixels = np.array(grayscale_image)
-    return np.mean(pixels)
-
-# Function to calculate the sharpness of the image
-def calculate_sharpness(image):
-    image_cv = np.array(image)
-    gray_image = cv2.cvtColor(image_cv, cv2.COLOR_RGB2GRAY)
-    laplacian_var = cv2.Laplacian(gray_image, cv2.CV_64F).var()
-    return laplacian_var
+# Optional folder of memory-mapped feature arrays shared by every Streamlit process on the machine
+# (export with `python feature_store.py --mmap <folder> <feature CSVs>`)
+shared_features_dir = os.environ.get("SCD_SHARED_FEATURES")
+
+# Prediction engine (feature store, trained model and content index, loaded once per process)
+# Reads the Parquet copies of the feature tables when they exist (`python feature_store.py <csv files>`)
+engine = load_engine([file_path_not_sickle, file_path_sickle], shared_features_dir)
+
+# Optional prediction service (`python prediction_service.py`); when set, predictions run there
+service_url = os.environ.get("SCD_PREDICTION_SERVICE_URL")
+
+# Results of recent uploads (prediction, preview and chart), shared by every session in this process
+# so the same reference image uploaded again is answered without recomputing anything
+result_cache = load_result_cache()
+
+# Function to run the prediction for an upload and render its preview and chart
+def analyze_upload(name, data, use_cnn):
+    # Decode at reduced resolution (only the preview size when the service does the analysis)
+    try:
+        decoded = decode_image(data, DISPLAY_MAX_SIDE) if service_url else decode_image(data)
+    except Exception:
+        decoded = None
+
+    # Run the prediction in this process, or on the prediction service when one is configured
+    if service_url:
+        result = request_prediction(service_url, name, data, use_cnn)
+    elif decoded is None:
+        result = {"quality": "unreadable", "prediction": None}
+    else:
+        result = engine.predict(name, data, use_cnn, decoded)
+
+    analysis = {"result": result, "thumbnail": None, "chart": None}
+    if decoded is not None and result["quality"] in ("ok", "no_cells", "not_in_dataset"):
+        # Send the browser a small preview, not the full-resolution upload
+        analysis["thumbnail"] = display_thumbnail(decoded.image)
+    if result["features"] is not None:
+        analysis["chart"] = feature_chart_spec(result["features"])
+    return analysis
+
+# Function to tell the user why the prediction service couldn't answer (it is down, timed out,
+# or refused the request, e.g. 409 when the CNN hasn't been exported there)
+def show_service_error(error):
+    if isinstance(error, urllib.error.HTTPError):
+        try:
+            message = json.load(error)["error"]
+        except Exception:
+            message = f"{error.code} {error.reason}"
+        st.error(f"The prediction service could not process the image: {message}")
+    else:
+        st.error("The prediction service can't be reached right now. Please try again later.")
+
+# Seconds between two revealed items
+REVEAL_INTERVAL = 2
+
+# Function to show items one after another with a CSS fade-in, each REVEAL_INTERVAL seconds after the previous one
+def reveal_items(items, color):
+    html = "".join(
+        f"<h3 class='reveal-item' style='color: {color}; animation-delay: {position * REVEAL_INTERVAL}s;'>{item.strip()}</h3>"
+        for position, item in enumerate(items)
+    )
+    st.markdown(
+        "<style>@keyframes reveal-item { from { opacity: 0; } to { opacity: 1; } } "
+        ".reveal-item { opacity: 0; animation: reveal-item 0.5s ease-in forwards; }</style>" + html,
+        unsafe_allow_html=True,
+    )
 
 # Streamlit application
 def main():
@@ -112,137 +112,123 @@ def main():
         unsafe_allow_html=True
     )
 
+    # Offer the CNN image classifier once it has been exported
+    # (`python cnn_model.py <sickle image folder> <not sickle image folder>`), on the prediction
+    # service when one is configured, since that is where the predictions run
+    if service_url:
+        try:
+            cnn_available = request_health(service_url).get("cnn", False)
+        except OSError as error:
+            show_service_error(error)
+            return
+    else:
+        cnn_available = os.path.exists(CNN_MODEL_PATH)
+    use_cnn = False
+    if cnn_available:
+        use_cnn = st.radio("Prediction mode", ["Cell features", "CNN image classifier"]) == "CNN image classifier"
+
+    # Batch mode: predict a whole slide batch at once and offer the results as a CSV
+    if st.checkbox("Batch mode (several images)"):
+        uploaded_images = st.file_uploader("Upload Images", type=["jpg", "jpeg", "png"], accept_multiple_files=True)
+        if uploaded_images:
+            images = ((uploaded.name, uploaded.getvalue()) for uploaded in uploaded_images)
+            if service_url:
+                try:
+                    results = pd.DataFrame(request_batch_prediction(service_url, images, use_cnn))
+                except OSError as error:
+                    show_service_error(error)
+                    return
+            else:
+                results = engine.predict_batch(images, use_cnn)
+            st.dataframe(results, use_container_width=True)
+            st.download_button("Download results (CSV)", results.to_csv(index=False), "sickle_cell_predictions.csv", "text/csv")
+        return
+
     # Image upload section
     uploaded_image = st.file_uploader("Upload an Image", type=["jpg", "jpeg", "png"])
 
     if uploaded_image:
-        image = Image.open(uploaded_image)
+        # Reuse the result of an identical upload (same image content and name, mode and model files)
+        data = uploaded_image.getvalue()
+        cache_key = prediction_key(data, uploaded_image.name, use_cnn, service_url or engine.version())
+        analysis = result_cache.get(cache_key)
+        if analysis is None:
+            try:
+                analysis = analyze_upload(uploaded_image.name, data, use_cnn)
+            except OSError as error:
+                # Only raised by the prediction service requests; nothing is cached
+                show_service_error(error)
+                return
+            size = len(analysis["thumbnail"] or b"") + len(repr(analysis["chart"])) + len(repr(analysis["result"]))
+            result_cache.put(cache_key, analysis, size)
+        result = analysis["result"]
 
         # Check image clarity: resolution, brightness, and sharpness
-        image_width, image_height = image.size
-        brightness = calculate_brightness(image)
-        sharpness = calculate_sharpness(image)
-
-        if image_width < 50 or image_height < 100:
+        if result["quality"] in ("low_resolution", "too_dark", "too_blurry", "unreadable"):
             st.markdown(
-               """<div style="text-align: center; background-color: #d4edda; color: #155724; padding: 10px; 
-                border-radius: 5px; font-size: 40px; font-weight: bold;"><b>Uploaded image resolution is too low. Please upload a higher resolution image.</b></div>""",
+               f"""<div style="text-align: center; background-color: #d4edda; color: #155724; padding: 10px; 
+                border-radius: 5px; font-size: 40px; font-weight: bold;"><b>{QUALITY_MESSAGES[result["quality"]]}</b></div>""",
                 unsafe_allow_html=True
             )
             return
 
-        elif brightness < 50:  
-            st.markdown(
-            """<div style="text-align: center; background-color: #d4edda; color: #155724; padding: 10px; 
-                border-radius: 5px; font-size: 40px; font-weight: bold;"><b>Uploaded image is too dark. Please upload a brighter image.</b></div>""",
-                unsafe_allow_html=True
-                )
-            return
-
-        elif sharpness < 10:  
-            st.markdown(
-                """<div style="text-align: center; background-color: #d4edda; color: #155724; padding: 10px; 
-                border-radius: 5px; font-size: 40px; font-weight: bold;"><b>Uploaded image is too blurry. Please upload a sharper image.</b></div>""",
-                    unsafe_allow_html=True
-                    )
-            return
-
-        else:
-            st.image(uploaded_image, caption="Uploaded Image", use_column_width=True)
-            st.write("Image uploaded successfully!")
+        st.image(analysis["thumbnail"], caption="Uploaded Image", use_column_width=True)
+        st.write("Image uploaded successfully!")
 
-        # Extract filename (assuming the uploaded filename matches the dataset)
-        filename = uploaded_image.name
-
-        # Predict based on the filename
-        row = data_combined[data_combined['Filename'] == filename]
-        if not row.empty:
-            # Plot the features
-            st.markdown(
-                "<h2 style='color: Turquoise; font-size: 30px;'>FEATURES OF SICKLE</h2>",
-                unsafe_allow_html=True,
-            )
-            plot_features(row)
+        if result["prediction"] is not None:
+            # Plot the features (an image the CNN classified outside the dataset has none)
+            if analysis["chart"] is not None:
+                st.markdown(
+                    "<h2 style='color: Turquoise; font-size: 30px;'>FEATURES OF SICKLE</h2>",
+                    unsafe_allow_html=True,
+                )
+                st.vega_lite_chart(spec=analysis["chart"], use_container_width=True)
 
-            result = predict_sickle_cell(filename)
             st.markdown(f"""
                 <div style="text-align: center; background-color: #d4edda; color: #155724; padding: 10px; 
                 border-radius: 5px; font-size: 54px; font-weight: bold;">
-                The Uploaded Image is: {result}
+                The Uploaded Image is: {result["prediction"]}
                     </div>
                         """,
     unsafe_allow_html=True,
 )
 
-            sickle_cell_detected, reasons = evaluate_sickle_cell(row.iloc[0])
-            if sickle_cell_detected:
-                
-
-                # Dynamically display treatment and precautions based on feature values
-                sickled_cells = row['Sickled Cells (%)'].values[0]
-                target_cells = row['Target Cells (%)'].values[0]
-                normocytes = row['Normocytes (%)'].values[0]
-                reticulocytes = row['Reticulocytes (%)'].values[0]
-
-                if sickled_cells >= 10:
-                    treatment = "Hydroxyurea, Blood Transfusions, Pain Management,Hydroxyurea ,Blood Transfusions,Bone Marrow,Antioxidants , Folic Acid"
-                    precaution = "Avoid cold temperatures, maintain hydration, and avoid infections."
-                elif target_cells <= 5:
-                    treatment = "Regular Monitoring, Blood Transfusions,Supplementation with folic acid and Vitamin B12."
-                    precaution = "Avoid high-altitude areas , extreme exertion, avoid dehydration ,Avoid Stress,Stay Hydrated."
-                elif normocytes <= 70:
-                    treatment = "Bone Marrow Transplant in severe cases ,Routine medical checkups for early detection,Acute Pain Crisis Treatment,Hydroxyurea to Decrease Hospitalizations,Antibiotics for Respiratory Tract Infections"
-                    precaution = "Stay away from stressful conditions."
-                elif reticulocytes >= 15:
-                    treatment = "Hydroxyurea and Reticulocyte reduction medication,Hydroxyurea,Blood Transfusions,Bone Marrow,Antioxidants"
-                    precaution = "Stay well-hydrated, avoid dehydration "
-                elif sickled_cells <= 5:
-                    treatment = "Use of Antioxidants to improve red blood cell health,Vitamin D Supplementation,Regular Monitoring of Blood Cell Count,Stem Cell Transplantation"
-                    precaution = "Monitor for signs of infection and fatigue, maintain hydration,avoid infections."
-                elif target_cells >= 25:
-                    treatment = "Supplementation with folic acid and Vitamin B12."
-                    precaution = "Avoid smoking and alcohol consumption,Prevent Injury to Joints and Bones,Keep Emergency Contact Information Available,Avoid Excessive Physical Contact"
-                elif normocytes >= 90:
-                    treatment = "Routine medical checkups for early detection,Folic Acid Supplementation,Iron Supplements,Routine Blood Tests"
-                    precaution = "Maintain a healthy diet and exercise regularly,Avoid Excessive Cold Weather Exposure,Be Cautious When Taking Medications,Avoid Being Overly Stressed"
-                elif reticulocytes <= 5:
-                    treatment ="Regular blood testing and iron supplementation."
-                    precaution = "Avoid high-stress situations and extreme weather,Use Supportive Footwear for Comfort,Avoid Triggers for Fatigue,Use Oxygen Therapy as Recommended"
+            if result["sickle_cell_detected"] and result["treatment"] is not None:
+                # Treatment and precautions chosen from the feature values
+                treatment = result["treatment"]
+                precaution = result["precaution"]
 
                 treatment_button = st.button("View Treatments")
                 precaution_button = st.button("View Precautions")
-                
-                import time
-                # Display treatment and precaution word by word when respective button is clicked
+
+                # Display treatment and precaution item by item when respective button is clicked
+                # (the browser staggers them, so the server thread isn't held while they appear)
                 if treatment_button:
                         st.markdown("<h1 style='color: Turquoise;font-size: 30px;'>Treatments for Sickle Cell:</h1>", unsafe_allow_html=True)
-                        treatment_items = treatment.split(',')
-                        for item in treatment_items:
-                            st.markdown(f"<h3 style='color:  charcoal;'>{item.strip()}</h3>", unsafe_allow_html=True)
-                            time.sleep(2)  # Pause for 1 second before displaying the next treatment
+                        reveal_items(treatment.split(','), "charcoal")
 
                 if precaution_button:
                         st.markdown("<h1 style='color: coral ;font-size: 30px;'>Precautions for Sickle Cell:</h1>", unsafe_allow_html=True)
-                        precaution_items = precaution.split(',')
-                        for item in precaution_items:
-                            st.markdown(f"<h3 style='color: Beige;'>{item.strip()}</h3>", unsafe_allow_html=True)
-                            time.sleep(2) 
+                        reveal_items(precaution.split(','), "Beige")
 
         else:
-            st.error("Filename not found in the dataset. Please ensure the uploaded image matches the dataset.")
+            st.error(QUALITY_MESSAGES[result["quality"]])
 
 if __name__ == "__main__":
     main()
-# Background Image with Base64 Encoding
-def get_base64_image(image_path):
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
+
+# Show how long each lazily loaded backend took to import (set SCD_IMPORT_REPORT=1;
+# `python lazy_imports.py` prints the cold import cost of every backend)
+if os.environ.get("SCD_IMPORT_REPORT"):
+    with st.expander("Backend import times"):
+        for name, seconds in import_report():
+            st.write(f"{name}: {seconds * 1000:.0f} ms")
 
 # Path to your local image
 image_path = "C:/Users/dell/Downloads/Sickle-Cell-Image-main/Sickle-Cell-Image-main/blood2.jpg"  # Replace with your actual image path
 
 # Encode the image to base64
-base64_image = get_base64_image(image_path)
+base64_image = get_base64_image(image_path, BACKGROUND_MAX_SIDE)
 
 # Apply custom CSS to add the background image with fixed positioning
 st.markdown(
@@ -261,7 +247,6 @@ st.markdown(
 
 
 import streamlit as st
-import base64
 from PIL import Image
 import os
 # Sidebar Chatbot Section with Background Image
@@ -275,7 +260,7 @@ with st.sidebar:
             f"""
             <style>
             [data-testid="stSidebar"] {{
-                background-image: url("data:image/jpeg;base64,{get_base64_image(sidebar_bg_path)}");
+                background-image: url("data:image/jpeg;base64,{get_base64_image(sidebar_bg_path, BACKGROUND_MAX_SIDE)}");
                 background-size: cover;
                 background-position: center;
                 background-attachment: fixed;
@@ -336,134 +321,5 @@ with st.sidebar:
     st.markdown("<h3 style='text-align: left; color:DarkSlateBlue;style='color:Lime;'>Chatbot</h3>", unsafe_allow_html=True)
     st.write("Ask me anything related to Sickle Cell Disease, symptoms, or care!")
 
-    # Chat functionality
-    if "messages" not in st.session_state:
-        st.session_state.messages = []  # Initialize chat history
-
-    user_input = st.text_input("Type your question here...")
-
-    if user_input:
-        # Generate a response based on user input
-        def generate_response(query):
-            if "care" in query.lower():
-                return (
-                    "Caring for someone with Sickle Cell Disease involves regular medical checkups, managing pain, staying hydrated, "
-                    "and avoiding extreme temperatures. Ensure they take prescribed medications and maintain a healthy lifestyle. "
-                    "Encourage regular communication with healthcare providers."
-                )
-            elif "symptoms" in query.lower():
-                return (
-                    "Common symptoms of Sickle Cell Disease include episodes of pain (called sickle cell crises), fatigue, swelling "
-                    "in hands and feet, frequent infections, and delayed growth or puberty. If these occur, consult a doctor."
-                )
-            elif "predict" in query.lower():
-                return (
-                    "Prediction typically involves analyzing blood smear images for abnormalities in red blood cell shape or using genetic testing. "
-                    "Our app can analyze uploaded images to assess the likelihood of Sickle Cell Disease."
-                )
-            elif "treatment" in query.lower():
-                return (
-                    "Treatment for Sickle Cell Disease includes medications like hydroxyurea, blood transfusions, and in severe cases, bone marrow "
-                    "transplants. Pain management and infection prevention are also crucial parts of treatment."
-                )
-            elif "precaution" in query.lower():
-                return (
-                    """Here are some precautions for Sickle Cell Disease:
-                    - Stay hydrated to reduce the risk of cell sickling.
-                    - Avoid extreme temperatures (both hot and cold).
-                    - Maintain a balanced diet and regular medical check-ups.
-                    - Avoid high altitudes to reduce oxygen deprivation.
-                    - Manage stress levels as it can trigger sickling episodes.
-                    - Get sufficient rest and sleep for the body to recover.
-                    - Avoid smoking and limit alcohol consumption to prevent complications.
-                    """
-                )
-            elif "causes" in query.lower():
-                return (
-                "Sickle Cell Disease is caused by a mutation in the HBB gene, which affects the production of hemoglobin. "
-                "This results in red blood cells becoming rigid and sickle-shaped, leading to blockages in blood flow."
-                )
-            elif "complications" in query.lower():
-                return (
-                "Complications of Sickle Cell Disease can include stroke, acute chest syndrome, organ damage, chronic pain, and vision problems. "
-                "Prompt treatment and preventive care can help manage these risks."
-                )
-            elif "genetics" in query.lower():
-                return (
-                "Sickle Cell Disease is inherited in an autosomal recessive pattern. A person must inherit two defective copies of the HBB gene—one from "
-                "each parent—to develop the disease. If they inherit one copy, they are a carrier (sickle cell trait)."
-                )   
-            elif "diet" in query.lower():
-                return (
-                "A healthy diet for someone with Sickle Cell Disease includes foods rich in folic acid, iron, vitamins, and minerals. "
-                "Focus on fruits, vegetables, lean proteins, whole grains, and staying hydrated."
-                )
-            elif "exercise" in query.lower():
-                return (
-                "Exercise is beneficial, but people with Sickle Cell Disease should avoid overexertion and dehydration. "
-                "Low-impact activities like walking, swimming, or yoga are generally safe."
-                )
-            elif "screening" in query.lower():
-                return (
-                "Newborn screening is a common way to detect Sickle Cell Disease early. This involves a simple blood test. "
-                "Prenatal genetic testing can also identify the condition before birth."
-                )
-            elif "mental health" in query.lower():
-                return (
-                "Living with Sickle Cell Disease can affect mental health due to chronic pain and stress. Support from mental health professionals, "
-                "counseling, and connecting with support groups can help."
-                )
-            elif "support groups" in query.lower():
-                return (
-                    "Support groups can provide emotional and social support for individuals with Sickle Cell Disease and their families. "
-                    "Connecting with others who share similar experiences can be very helpful."
-                )
-            elif "vaccinations" in query.lower():
-                return (
-                "Vaccinations are crucial for individuals with Sickle Cell Disease, as they are more prone to infections. "
-                "Stay updated on vaccines like influenza, pneumococcal, and meningococcal vaccines."
-                )
-            elif "childbirth" in query.lower():
-                return (
-                "Pregnancy with Sickle Cell Disease requires special care to reduce risks to both the mother and baby. "
-                "Regular monitoring and consultation with a specialist are important."
-                )
-            elif "travel tips" in query.lower():
-                return (
-                "When traveling with Sickle Cell Disease, avoid high altitudes, stay hydrated, and carry medical records. "
-                "Ensure you have access to medical care at your destination and take medications as prescribed."
-                )
-            elif "pain management" in query.lower():
-                return (
-                "Pain management in Sickle Cell Disease includes medications such as NSAIDs, opioids for severe pain, and other strategies like warm compresses, "
-                "hydration, and relaxation techniques."
-                )
-            elif "school and work" in query.lower():
-                return (
-                "Children and adults with Sickle Cell Disease may need accommodations at school or work to manage fatigue and pain. "
-                "Open communication with teachers or employers can help create a supportive environment."
-                )
-            elif "emergency" in query.lower():
-                return (
-                    "Seek immediate medical attention if someone with Sickle Cell Disease experiences severe chest pain, difficulty breathing, stroke symptoms, "
-                    "or extreme fatigue. These could be signs of life-threatening complications."
-                )
-            else:
-                return (
-                    "I'm here to help with your queries about Sickle Cell Disease! Please ask about symptoms, care, prediction, or treatments for "
-                    "specific answers."
-                )
-
-        chatbot_response = generate_response(user_input)
-
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_input})
-        # Add bot response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": chatbot_response})
-
-    # Display chat messages
-    for message in st.session_state.messages:
-        if message["role"] == "user":
-            st.markdown(f"**You:** {message['content']}")
-        else:
-            st.markdown(f"**Bot:** {message['content']}")
+    # Chat functionality (recent messages only; see chat_history.py)
+    chat_box(generate_response)
@@ -0,0 +1,37 @@
+import base64
+import io
+import os
+
+from PIL import Image
+
+from process_cache import cached_resource
+
+# Page backgrounds are re-encoded as JPEGs no larger than this; they are stretched to the
+# window, so a bigger original only adds bytes to every page load
+BACKGROUND_MAX_SIDE = 1920
+BACKGROUND_QUALITY = 80
+
+
+# Function to read an image, re-encoding it as a smaller JPEG when max_side is given
+def _read_asset(image_path, max_side, quality):
+    with open(image_path, "rb") as img_file:
+        data = img_file.read()
+    if max_side is None:
+        return data
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", (max_side, max_side))
+        image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    # Keep the original when it is already smaller
+    return min(data, buffer.getvalue(), key=len)
+
+
+# Function to convert image to base64, once per process (encoded again only when the file changes)
+#   max_side: re-encode as a JPEG no larger than max_side pixels (for backgrounds)
+def get_base64_image(image_path, max_side=None, quality=BACKGROUND_QUALITY):
+    stat = os.stat(image_path)
+    return cached_resource(("asset", os.path.abspath(image_path), max_side, quality), (stat.st_mtime_ns, stat.st_size),
+                           lambda: base64.b64encode(_read_asset(image_path, max_side, quality)).decode())
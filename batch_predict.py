@@ -0,0 +1,131 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from cnn_model import CNN_MODEL_PATH, preprocess, require_cnn_classifier
+from image_decode import decode_image
+from image_quality import check_quality
+from lazy_imports import load_backend
+from model_registry import CLASSIFY_MEASURED, FEATURES
+from treatment_rules import score_cohort
+
+# Columns of a batch result row, before the rule results are appended
+RESULT_COLUMNS = ["Image", "Quality", "Source"] + FEATURES + ["Prediction"]
+
+
+# Function to label a model output
+def _label(prediction):
+    return 'SICKLE CELL' if prediction == 1 else 'NOT SICKLE CELL'
+
+
+# Function to predict a whole batch of images at once
+#   images: iterable of (name, bytes) pairs; each image is fully processed as it is read, so only
+#   its results row (and, in CNN mode, its small CNN input) is kept for the rest of the batch
+#   use_cnn: classify with the exported CNN instead of the cell features
+# Returns one results row per image, in the same order
+# Raises FileNotFoundError when use_cnn is set but the CNN hasn't been exported
+def predict_batch(images, feature_store, clf, content_index=None, use_cnn=False):
+    cnn = require_cnn_classifier() if use_cnn else None
+    results = []
+    to_classify = []  # results positions of the measured images, for the model call
+    cnn_positions = []  # results positions and CNN inputs of the images the CNN classifies
+    cnn_inputs = []
+    analyze_smear = None
+    for name, data in images:
+        result = {"Image": name, "Quality": "ok", "Source": "", **{feature: None for feature in FEATURES},
+                  "Prediction": ""}
+        results.append(result)
+        try:
+            upload = decode_image(data)
+        except Exception:
+            result["Quality"] = "unreadable"
+            continue
+        image = upload.image
+
+        problem = check_quality(image, upload.original_size)
+        if problem is not None:
+            result["Quality"] = problem
+            continue
+
+        # Features: the dataset row where the image is known, otherwise measured from the image
+        # (when CLASSIFY_MEASURED is on); in CNN mode an unknown image is left to the CNN, without features
+        filename = name
+        if content_index is not None:
+            filename = content_index.lookup(data, image) or filename
+        record = feature_store.get(filename)
+        row = None
+        if record is not None:
+            row = record.as_dict()
+            result["Source"] = "dataset"
+            result["Prediction"] = 'SICKLE CELL' if record.sickle_cell else 'NOT SICKLE CELL'
+        elif cnn is None and not CLASSIFY_MEASURED:
+            result["Quality"] = "not_in_dataset"
+            continue
+        elif cnn is None:
+            analyze_smear = analyze_smear or load_backend("cell_morphology").analyze_smear
+            row = analyze_smear(image)
+            result["Source"] = "measured"
+            if row["Total RBCs (in millions)"] > 0:
+                to_classify.append(len(results) - 1)
+            else:
+                result["Quality"] = "no_cells"
+        if row is not None:
+            for feature in FEATURES:
+                result[feature] = row[feature]
+
+        if cnn is not None:
+            cnn_positions.append(len(results) - 1)
+            cnn_inputs.append(preprocess([image])[0])
+
+    # One model call for every measured image
+    if to_classify:
+        predictions = clf.predict(pd.DataFrame([results[position] for position in to_classify])[FEATURES])
+        for position, prediction in zip(to_classify, predictions):
+            results[position]["Prediction"] = _label(prediction)
+
+    # One CNN call for every image that passed the quality check
+    if cnn_inputs:
+        labels = cnn.predict_batch(np.stack(cnn_inputs))
+        for position, label in zip(cnn_positions, labels):
+            results[position]["Prediction"] = label
+            results[position]["Source"] += "+cnn" if results[position]["Source"] else "cnn"
+
+    # Evaluation, treatment and precautions of every classified image, with the same rules as the page
+    table = pd.DataFrame(results, columns=RESULT_COLUMNS)  # columns kept for an empty batch
+    scored = score_cohort(table)
+    scored.loc[table["Prediction"] == "", :] = [False, "", None, None]
+    return pd.concat([table, scored], axis=1)
+
+
+# Function to list the image files named on the command line (files or folders)
+def _collect_paths(paths):
+    list_images = load_backend("feature_extraction").list_images
+    collected = []
+    for path in paths:
+        collected.extend(sorted(list_images(path)) if os.path.isdir(path) else [path])
+    return collected
+
+
+# Function to read the image files one at a time, as predict_batch consumes them
+def _read_images(paths):
+    for path in paths:
+        with open(path, "rb") as f:
+            yield os.path.basename(path), f.read()
+
+
+if __name__ == "__main__":
+    # Usage: python batch_predict.py <image or folder> [...] [--output results.csv] [--cnn]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--output", default="batch_predictions.csv")
+    parser.add_argument("--cnn", action="store_true", help="classify with the exported CNN")
+    args = parser.parse_args()
+    if args.cnn and not os.path.exists(CNN_MODEL_PATH):
+        parser.error("the CNN model has not been exported (run cnn_model.py first)")
+
+    engine = load_backend("prediction_engine").load_engine()
+    table = engine.predict_batch(_read_images(_collect_paths(args.paths)), use_cnn=args.cnn)
+    table.to_csv(args.output, index=False)
+    print(f"{len(table)} predictions saved as {args.output}")
@@ -0,0 +1,143 @@
+import cv2
+import numpy as np
+
+# Smears are analysed with their longest side scaled down to this many pixels
+ANALYSIS_MAX_SIDE = 1024
+
+# Components smaller than this fraction of the median cell area are debris or platelets
+MIN_AREA_FRACTION = 0.25
+
+# Cell shape thresholds
+SICKLE_ECCENTRICITY = 0.9  # elongated crescent / sickle shape (length ≈ 2.3x width or more)
+ROUND_ECCENTRICITY = 0.7  # round enough to be a normocyte, target cell or reticulocyte
+TARGET_HOLE_FRACTION = 0.04  # central pale spot (bull's-eye) covering this much of the cell
+RETICULOCYTE_AREA_RATIO = 1.2  # reticulocytes are larger than the typical cell ...
+NORMOCYTE_AREA_RANGE = (0.75, 1.25)  # ... normocytes stay close to the typical cell size
+
+# Anisocytosis grading by the coefficient of variation of cell area
+ANISOCYTOSIS_LEVELS = [(0.20, "Mild"), (0.35, "Moderate")]
+
+# Calibration from cells per analysed field to millions of RBCs per μL
+# (500 cells on a 1024x1024 field ≈ 5.0 million/μL; adjust for your microscope)
+REFERENCE_FIELD_PIXELS = 1024 * 1024
+RBC_COUNT_SCALE = 0.01
+
+
+# Function to convert a PIL image or RGB array to a grayscale array at analysis resolution
+def _analysis_gray(image):
+    pixels = np.asarray(image)
+    if pixels.ndim == 3:
+        gray = cv2.cvtColor(pixels[:, :, :3], cv2.COLOR_RGB2GRAY)
+    else:
+        gray = pixels.astype(np.uint8)
+    height, width = gray.shape
+    scale = ANALYSIS_MAX_SIDE / max(height, width)
+    if scale < 1:
+        gray = cv2.resize(gray, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    return gray
+
+
+# Function to segment the cells: returns the hole-filled cell mask and the mask of the holes
+def _segment(gray):
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    # Cells are darker than the background, so Otsu with an inverted threshold selects them
+    _, mask = cv2.threshold(blurred, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+
+    # Background regions not connected to the image border are holes inside cells (central pallor)
+    _, background_labels = cv2.connectedComponents(1 - mask, connectivity=4)
+    border = np.concatenate([background_labels[0], background_labels[-1],
+                             background_labels[:, 0], background_labels[:, -1]])
+    is_hole = np.ones(background_labels.max() + 1, dtype=bool)
+    is_hole[np.unique(border)] = False
+    is_hole[0] = False  # label 0 is the cells themselves
+    holes = is_hole[background_labels]
+    return mask.astype(bool) | holes, holes
+
+
+# Function to measure every cell at once: area, eccentricity, circularity, hole fraction and intensity
+def measure_cells(gray):
+    filled, holes = _segment(gray)
+    count, labels = cv2.connectedComponents(filled.astype(np.uint8), connectivity=8)
+    if count <= 1:
+        return None
+
+    # Per-cell sums of pixel coordinates give the second moments of every cell in one pass
+    ys, xs = np.nonzero(filled)
+    cell = labels[ys, xs]
+    xs = xs.astype(np.float64)
+    ys = ys.astype(np.float64)
+    area = np.bincount(cell, minlength=count).astype(np.float64)
+    safe_area = np.maximum(area, 1)
+    mean_x = np.bincount(cell, xs, count) / safe_area
+    mean_y = np.bincount(cell, ys, count) / safe_area
+    cov_xx = np.bincount(cell, xs * xs, count) / safe_area - mean_x ** 2
+    cov_yy = np.bincount(cell, ys * ys, count) / safe_area - mean_y ** 2
+    cov_xy = np.bincount(cell, xs * ys, count) / safe_area - mean_x * mean_y
+
+    # Eigenvalues of the covariance matrix are the squared semi-axes of the equivalent ellipse
+    half_trace = (cov_xx + cov_yy) / 2
+    spread = np.sqrt(((cov_xx - cov_yy) / 2) ** 2 + cov_xy ** 2)
+    major = half_trace + spread
+    minor = np.maximum(half_trace - spread, 0)
+    eccentricity = np.sqrt(1 - minor / np.maximum(major, 1e-9))
+
+    # Perimeter from the boundary pixels (8-connected boundaries undercount a circle by 2√2/π)
+    eroded = cv2.erode(filled.astype(np.uint8), cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3))).astype(bool)
+    boundary = filled & ~eroded
+    perimeter = np.bincount(labels[boundary], minlength=count) * (np.pi / (2 * np.sqrt(2)))
+    circularity = np.clip(4 * np.pi * area / np.maximum(perimeter, 1) ** 2, 0, 1)
+
+    hole_fraction = np.bincount(labels[holes], minlength=count) / safe_area
+    intensity = np.bincount(cell, gray[filled].astype(np.float64), count) / safe_area
+
+    # Drop the background (label 0) and debris much smaller than a typical cell
+    keep = np.arange(count) > 0
+    keep &= area >= MIN_AREA_FRACTION * np.median(area[keep])
+    return {
+        "area": area[keep],
+        "eccentricity": eccentricity[keep],
+        "circularity": circularity[keep],
+        "hole_fraction": hole_fraction[keep],
+        "intensity": intensity[keep],
+        "field_pixels": gray.size,
+    }
+
+
+# Function to compute the smear features with the same columns as the feature CSVs
+def analyze_smear(image):
+    cells = measure_cells(_analysis_gray(image))
+    if cells is None or len(cells["area"]) == 0:
+        return {
+            "Total RBCs (in millions)": 0.0,
+            "Sickled Cells (%)": 0.0,
+            "Normocytes (%)": 0.0,
+            "Target Cells (%)": 0.0,
+            "Anisocytosis Severity": "Mild",
+            "Reticulocytes (%)": 0.0,
+        }
+
+    area = cells["area"]
+    eccentricity = cells["eccentricity"]
+    size = area / np.median(area)
+    round_cells = eccentricity < ROUND_ECCENTRICITY
+
+    sickled = (eccentricity >= SICKLE_ECCENTRICITY) | (cells["circularity"] < 0.5)
+    target = ~sickled & round_cells & (cells["hole_fraction"] >= TARGET_HOLE_FRACTION)
+    reticulocytes = (~sickled & ~target & round_cells & (size >= RETICULOCYTE_AREA_RATIO)
+                     & (cells["intensity"] < np.median(cells["intensity"])))
+    normocytes = (~sickled & ~target & round_cells
+                  & (size >= NORMOCYTE_AREA_RANGE[0]) & (size <= NORMOCYTE_AREA_RANGE[1]))
+
+    variation = area.std() / area.mean()
+    severity = next((level for limit, level in ANISOCYTOSIS_LEVELS if variation < limit), "Severe")
+    total_rbcs = len(area) * REFERENCE_FIELD_PIXELS / cells["field_pixels"] * RBC_COUNT_SCALE
+
+    return {
+        "Total RBCs (in millions)": round(float(total_rbcs), 2),
+        "Sickled Cells (%)": round(float(sickled.mean() * 100), 2),
+        "Normocytes (%)": round(float(normocytes.mean() * 100), 2),
+        "Target Cells (%)": round(float(target.mean() * 100), 2),
+        "Anisocytosis Severity": severity,
+        "Reticulocytes (%)": round(float(reticulocytes.mean() * 100), 2),
+    }
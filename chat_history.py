@@ -0,0 +1,88 @@
+import json
+import os
+import uuid
+from collections import deque
+
+import streamlit as st
+
+# Messages kept in each session (older ones are dropped, or spilled to disk when enabled)
+HISTORY_LIMIT = 50
+
+# Messages drawn in the sidebar on each rerun
+DISPLAY_WINDOW = 10
+
+# Optional folder where each session's older messages are appended as JSON lines
+SPILL_DIR = os.environ.get("SCD_CHAT_SPILL_DIR")
+
+
+# Chat history of one session, kept in a ring buffer so its size and rendering cost stay constant
+class ChatHistory:
+    def __init__(self, limit=HISTORY_LIMIT, spill_dir=None):
+        self.messages = deque(maxlen=limit)
+        self.spill_path = os.path.join(spill_dir, f"{uuid.uuid4().hex}.jsonl") if spill_dir else None
+        self.dropped = 0  # messages pushed out of the buffer
+        self.last_question = None
+
+    def __len__(self):
+        return len(self.messages)
+
+    # Function to add a message, moving the oldest one out when the buffer is full
+    def append(self, role, content):
+        if len(self.messages) == self.messages.maxlen:
+            oldest = self.messages[0]
+            if self.spill_path:
+                os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(oldest) + "\n")
+            self.dropped += 1
+        self.messages.append({"role": role, "content": content})
+
+    # Function to add a question and its answer
+    def add_exchange(self, question, answer):
+        self.append("user", question)
+        self.append("assistant", answer)
+        self.last_question = question
+
+    # Function to return the last count messages, oldest first
+    def recent(self, count=DISPLAY_WINDOW):
+        start = max(len(self.messages) - count, 0)
+        return [self.messages[position] for position in range(start, len(self.messages))]
+
+    # Function to read back the messages spilled to disk
+    def spilled(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return []
+        with open(self.spill_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+
+# Function to get this session's chat history
+def get_chat_history(limit=HISTORY_LIMIT, spill_dir=SPILL_DIR):
+    if "chat_history" not in st.session_state:
+        st.session_state.chat_history = ChatHistory(limit, spill_dir)  # Initialize chat history
+    return st.session_state.chat_history
+
+
+# Function to display the most recent chat messages
+def render_chat_history(history, window=DISPLAY_WINDOW):
+    hidden = history.dropped + max(len(history) - window, 0)
+    if hidden:
+        st.caption(f"{hidden} earlier messages not shown")
+    for message in history.recent(window):
+        if message["role"] == "user":
+            st.markdown(f"**You:** {message['content']}")
+        else:
+            st.markdown(f"**Bot:** {message['content']}")
+
+
+# Function to run the sidebar chat: question box, answer and the recent messages
+# The question box keeps its text across reruns, so a question is only answered when it changes
+def chat_box(generate_response):
+    history = get_chat_history()
+    user_input = st.text_input("Type your question here...")
+
+    if user_input and user_input != history.last_question:
+        # Generate a response based on user input and add both to the chat history
+        history.add_exchange(user_input, generate_response(user_input))
+
+    render_chat_history(history)
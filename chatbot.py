@@ -0,0 +1,216 @@
+import json
+import os
+import re
+
+import numpy as np
+
+from process_cache import cached_resource
+
+# Chatbot intents in priority order: (keywords, response)
+# A question gets the response of the first intent with a keyword anywhere in it
+INTENTS = [
+    (("care",),
+        "Caring for someone with Sickle Cell Disease involves regular medical checkups, managing pain, staying hydrated, "
+        "and avoiding extreme temperatures. Ensure they take prescribed medications and maintain a healthy lifestyle. "
+        "Encourage regular communication with healthcare providers."),
+    (("symptoms",),
+        "Common symptoms of Sickle Cell Disease include episodes of pain (called sickle cell crises), fatigue, swelling "
+        "in hands and feet, frequent infections, and delayed growth or puberty. If these occur, consult a doctor."),
+    (("predict",),
+        "Prediction typically involves analyzing blood smear images for abnormalities in red blood cell shape or using genetic testing. "
+        "Our app can analyze uploaded images to assess the likelihood of Sickle Cell Disease."),
+    (("treatment",),
+        "Treatment for Sickle Cell Disease includes medications like hydroxyurea, blood transfusions, and in severe cases, bone marrow "
+        "transplants. Pain management and infection prevention are also crucial parts of treatment."),
+    (("precaution",),
+        "Here are some precautions for Sickle Cell Disease:\n"
+        "- Stay hydrated to reduce the risk of cell sickling.\n"
+        "- Avoid extreme temperatures (both hot and cold).\n"
+        "- Maintain a balanced diet and regular medical check-ups.\n"
+        "- Avoid high altitudes to reduce oxygen deprivation.\n"
+        "- Manage stress levels as it can trigger sickling episodes.\n"
+        "- Get sufficient rest and sleep for the body to recover.\n"
+        "- Avoid smoking and limit alcohol consumption to prevent complications."),
+    (("causes",),
+        "Sickle Cell Disease is caused by a mutation in the HBB gene, which affects the production of hemoglobin. "
+        "This results in red blood cells becoming rigid and sickle-shaped, leading to blockages in blood flow."),
+    (("complications",),
+        "Complications of Sickle Cell Disease can include stroke, acute chest syndrome, organ damage, chronic pain, and vision problems. "
+        "Prompt treatment and preventive care can help manage these risks."),
+    (("genetics",),
+        "Sickle Cell Disease is inherited in an autosomal recessive pattern. A person must inherit two defective copies of the HBB gene—one from "
+        "each parent—to develop the disease. If they inherit one copy, they are a carrier (sickle cell trait)."),
+    (("diet",),
+        "A healthy diet for someone with Sickle Cell Disease includes foods rich in folic acid, iron, vitamins, and minerals. "
+        "Focus on fruits, vegetables, lean proteins, whole grains, and staying hydrated."),
+    (("exercise",),
+        "Exercise is beneficial, but people with Sickle Cell Disease should avoid overexertion and dehydration. "
+        "Low-impact activities like walking, swimming, or yoga are generally safe."),
+    (("screening",),
+        "Newborn screening is a common way to detect Sickle Cell Disease early. This involves a simple blood test. "
+        "Prenatal genetic testing can also identify the condition before birth."),
+    (("how to use this system", "platform"),
+        "1.First upload clear microscopic image of our blood cell\n"
+        "2.Then you get result prediction\n"
+        "3.If you want information about precaution or treatments then click on precaution or treatment button"),
+    (("mental health",),
+        "Living with Sickle Cell Disease can affect mental health due to chronic pain and stress. Support from mental health professionals, "
+        "counseling, and connecting with support groups can help."),
+    (("support groups",),
+        "Support groups can provide emotional and social support for individuals with Sickle Cell Disease and their families. "
+        "Connecting with others who share similar experiences can be very helpful."),
+    (("vaccinations",),
+        "Vaccinations are crucial for individuals with Sickle Cell Disease, as they are more prone to infections. "
+        "Stay updated on vaccines like influenza, pneumococcal, and meningococcal vaccines."),
+    (("childbirth",),
+        "Pregnancy with Sickle Cell Disease requires special care to reduce risks to both the mother and baby. "
+        "Regular monitoring and consultation with a specialist are important."),
+    (("travel tips",),
+        "When traveling with Sickle Cell Disease, avoid high altitudes, stay hydrated, and carry medical records. "
+        "Ensure you have access to medical care at your destination and take medications as prescribed."),
+    (("pain management",),
+        "Pain management in Sickle Cell Disease includes medications such as NSAIDs, opioids for severe pain, and other strategies like warm compresses, "
+        "hydration, and relaxation techniques."),
+    (("school and work",),
+        "Children and adults with Sickle Cell Disease may need accommodations at school or work to manage fatigue and pain. "
+        "Open communication with teachers or employers can help create a supportive environment."),
+    (("emergency",),
+        "Seek immediate medical attention if someone with Sickle Cell Disease experiences severe chest pain, difficulty breathing, stroke symptoms, "
+        "or extreme fatigue. These could be signs of life-threatening complications."),
+]
+
+# Curated questions and answers searched when no keyword matches
+FAQ_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatbot_faq.json")
+
+# Cosine similarity a FAQ entry needs to be given as the answer
+MIN_SIMILARITY = 0.2
+
+# Words too common to tell questions apart
+STOP_WORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it its me my of on or should so that "
+    "the their them there these they this to was what when where which who why will with you your".split()
+)
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Response when no keyword or FAQ entry matches
+FALLBACK_RESPONSE = (
+    "I'm here to help with your queries about Sickle Cell Disease! Please ask about symptoms, care, prediction, or treatments for "
+    "specific answers."
+)
+
+
+# Function to build a regex matching any of the words, factored as a character trie
+# ("care|causes" becomes "ca(?:re|uses)"), so each position of the text is tested against the
+# next character of the trie instead of against every word in turn
+def _trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if "" in node else "")
+
+    return emit(trie)
+
+
+# Keyword matcher over every intent at once
+# All keywords are compiled into one trie-shaped regex inside a lookahead, so a single scan of
+# the lowercased question finds every keyword occurrence, however many intents there are
+class IntentMatcher:
+    def __init__(self, intents, fallback):
+        self.responses = [response for _, response in intents]
+        self.fallback = fallback
+        # Best (lowest) intent number for each keyword; a keyword that contains another keyword
+        # also counts as a match of that one, as the substring test of the old if/elif chain did
+        keywords = {}
+        for position, (intent_keywords, _) in enumerate(intents):
+            for keyword in intent_keywords:
+                keywords.setdefault(keyword.lower(), position)
+        self.priority = {keyword: min(position for other, position in keywords.items() if other in keyword)
+                         for keyword in keywords}
+        self.pattern = re.compile(f"(?=({_trie_pattern(keywords)}))")
+
+    # Function to return the number of the matching intent, or None
+    def match(self, query):
+        found = [self.priority[keyword] for keyword in self.pattern.findall(query.lower())]
+        return min(found) if found else None
+
+    # Function to generate a response based on user input
+    def respond(self, query):
+        position = self.match(query)
+        return self.fallback if position is None else self.responses[position]
+
+
+# Function to split text into lowercase terms, without stop words and plural "s"
+def tokenize(text):
+    return [term[:-1] if len(term) > 3 and term.endswith("s") and not term.endswith("ss") else term
+            for term in TOKEN_PATTERN.findall(text.lower()) if term not in STOP_WORDS]
+
+
+# TF-IDF index of the FAQ: one L2-normalized float32 row per entry, so a question is answered
+# with one matrix-vector product (cosine similarity against every entry)
+class FaqIndex:
+    def __init__(self, entries):
+        self.questions = [entry["question"] for entry in entries]
+        self.answers = [entry["answer"] for entry in entries]
+        # The question's words count twice: they say what the entry is about
+        documents = [tokenize(entry["question"]) * 2 + tokenize(entry["answer"]) for entry in entries]
+        self.vocabulary = {term: column for column, term in enumerate(sorted({term for document in documents for term in document}))}
+
+        counts = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, document in enumerate(documents):
+            np.add.at(counts[row], [self.vocabulary[term] for term in document], 1)
+        self.idf = (np.log((1 + len(documents)) / (1 + (counts > 0).sum(axis=0))) + 1).astype(np.float32)
+        self.vectors = self._normalize(np.log1p(counts) * self.idf)
+
+    @staticmethod
+    def _normalize(vectors):
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    # Function to return the k most similar entries as (similarity, question, answer), best first
+    def search(self, query, k=3):
+        columns = [self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary]
+        if not columns:
+            return []
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        np.add.at(vector, columns, 1)
+        scores = self.vectors @ self._normalize(np.log1p(vector) * self.idf)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(float(scores[row]), self.questions[row], self.answers[row]) for row in best]
+
+
+# Function to load the FAQ index once per process (rebuilt when the FAQ file changes)
+def load_faq_index(faq_path=FAQ_PATH):
+    def load():
+        with open(faq_path, encoding="utf-8") as f:
+            return FaqIndex(json.load(f))
+
+    return cached_resource(("faq_index", os.path.abspath(faq_path)), os.path.getmtime(faq_path), load)
+
+
+_matcher = IntentMatcher(INTENTS, FALLBACK_RESPONSE)
+
+
+# Function to generate a response based on user input
+# Keywords are checked first; questions they don't cover are answered from the FAQ when
+# retrieval is on and an entry is similar enough, and get the fallback text otherwise
+def generate_response(query, retrieval=True):
+    position = _matcher.match(query)
+    if position is not None:
+        return _matcher.responses[position]
+    if retrieval and os.path.exists(FAQ_PATH):
+        results = load_faq_index().search(query, k=1)
+        if results and results[0][0] >= MIN_SIMILARITY:
+            return results[0][2]
+    return _matcher.fallback
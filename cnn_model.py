@@ -0,0 +1,177 @@
+import argparse
+import os
+import tempfile
+import threading
+
+import numpy as np
+from PIL import Image
+
+from lazy_imports import load_backend
+from process_cache import cached_resource
+
+# Input size of the CNN (smears are resized to IMAGE_SIZE x IMAGE_SIZE RGB)
+IMAGE_SIZE = 128
+
+# Exported CPU model used by the prediction page
+CNN_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "sickle_cnn.tflite")
+
+
+# Function to turn PIL images into the CNN's input batch (N x IMAGE_SIZE x IMAGE_SIZE x 3, 0-1 floats)
+def preprocess(images):
+    batch = np.empty((len(images), IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.float32)
+    for position, image in enumerate(images):
+        image.draft("RGB", (IMAGE_SIZE * 2, IMAGE_SIZE * 2))  # let JPEG decode at reduced size
+        image = image.convert("RGB")
+        batch[position] = np.asarray(image.resize((IMAGE_SIZE, IMAGE_SIZE), Image.BILINEAR), dtype=np.float32)
+    return batch / 255.0
+
+
+# Function to load the training images from the sickle / not-sickle folders
+def load_dataset(sickle_folder, not_sickle_folder):
+    list_images = load_backend("feature_extraction").list_images
+    sickle_paths = list_images(sickle_folder)
+    not_sickle_paths = list_images(not_sickle_folder)
+    paths = sickle_paths + not_sickle_paths
+    labels = np.array([1] * len(sickle_paths) + [0] * len(not_sickle_paths), dtype=np.float32)
+    images = []
+    for path in paths:
+        with Image.open(path) as image:
+            images.append(preprocess([image])[0])
+    return np.stack(images), labels
+
+
+# Function to build the small CNN classifier
+def build_cnn():
+    keras = load_backend("tensorflow").keras
+    layers = keras.layers
+    model = keras.Sequential([
+        keras.Input(shape=(IMAGE_SIZE, IMAGE_SIZE, 3)),
+        layers.Conv2D(16, (3, 3), activation='relu'),
+        layers.MaxPooling2D((2, 2)),
+        layers.Conv2D(32, (3, 3), activation='relu'),
+        layers.MaxPooling2D((2, 2)),
+        layers.Conv2D(64, (3, 3), activation='relu'),
+        layers.MaxPooling2D((2, 2)),
+        layers.Flatten(),
+        layers.Dense(64, activation='relu'),
+        layers.Dropout(0.5),
+        layers.Dense(1, activation='sigmoid'),
+    ])
+    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+    return model
+
+
+# Function to train the CNN offline on the smear images
+def train_cnn(sickle_folder, not_sickle_folder, epochs=10, batch_size=32):
+    X, y = load_dataset(sickle_folder, not_sickle_folder)
+    # Shuffle before fitting: validation_split takes the last rows, which would all be one class
+    order = np.random.default_rng(42).permutation(len(y))
+    X, y = X[order], y[order]
+    model = build_cnn()
+    model.fit(X, y, epochs=epochs, batch_size=batch_size, validation_split=0.2, shuffle=True)
+    return model, X
+
+
+# Function to export a trained model to TensorFlow Lite for CPU inference
+#   quantization: "float16" (half-size weights) or "int8" (integer weights and activations,
+#   calibrated on sample_images); float inputs and outputs are kept either way
+def export_tflite(model, output_path=CNN_MODEL_PATH, quantization="int8", sample_images=None):
+    tf = load_backend("tensorflow")
+    with tempfile.TemporaryDirectory() as saved_model_dir:
+        model.export(saved_model_dir)
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        elif quantization == "int8":
+            if sample_images is None:
+                raise ValueError("int8 quantization needs sample_images for calibration")
+            calibration = np.random.default_rng(42).permutation(len(sample_images))[:200]
+            converter.representative_dataset = lambda: ([sample_images[i][np.newaxis]] for i in calibration)
+        else:
+            raise ValueError(f"Unknown quantization: {quantization}")
+        tflite_model = converter.convert()
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(tflite_model)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+# Function to create a TFLite interpreter, preferring the standalone runtimes over full TensorFlow
+def _make_interpreter(model_path):
+    for module_name in ("ai_edge_litert.interpreter", "tflite_runtime.interpreter"):
+        try:
+            return load_backend(module_name).Interpreter(model_path=model_path, num_threads=1)
+        except ImportError:
+            pass
+    return load_backend("tensorflow").lite.Interpreter(model_path=model_path, num_threads=1)
+
+
+# CNN classifier running the exported TFLite model
+class CnnClassifier:
+    def __init__(self, model_path):
+        self.interpreter = _make_interpreter(model_path)
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self.batch_size = 1
+        # A TFLite interpreter can't run two inferences at once, so sessions take turns
+        self.lock = threading.Lock()
+
+    # Function to return the probability of sickle cell for each image
+    def predict_proba(self, images):
+        return self.predict_proba_batch(preprocess(images))
+
+    # Function to return the probability of sickle cell for each row of an input batch (see preprocess)
+    def predict_proba_batch(self, batch):
+        with self.lock:
+            if len(batch) != self.batch_size:
+                self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self.batch_size = len(batch)
+            self.interpreter.set_tensor(self.input_index, batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index)[:, 0].copy()
+
+    # Function to classify each image as 'SICKLE CELL' or 'NOT SICKLE CELL'
+    def predict(self, images):
+        return self.predict_batch(preprocess(images))
+
+    # Function to classify each row of an input batch (see preprocess)
+    def predict_batch(self, batch):
+        return ['SICKLE CELL' if probability >= 0.5 else 'NOT SICKLE CELL'
+                for probability in self.predict_proba_batch(batch)]
+
+
+# Function to load the exported classifier once per process, returning None when it hasn't been exported
+def load_cnn_classifier(model_path=CNN_MODEL_PATH):
+    if not os.path.exists(model_path):
+        return None
+    return cached_resource(("cnn_classifier", os.path.abspath(model_path)), os.path.getmtime(model_path),
+                           lambda: CnnClassifier(model_path))
+
+
+# Function to load the exported classifier for a prediction that asked for it,
+# raising FileNotFoundError when it hasn't been exported
+def require_cnn_classifier(model_path=CNN_MODEL_PATH):
+    cnn = load_cnn_classifier(model_path)
+    if cnn is None:
+        raise FileNotFoundError("The CNN model has not been exported (run cnn_model.py first)")
+    return cnn
+
+
+if __name__ == "__main__":
+    # Usage: python cnn_model.py <sickle image folder> <not sickle image folder> [--quantization int8|float16]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sickle_folder")
+    parser.add_argument("not_sickle_folder")
+    parser.add_argument("--quantization", choices=["int8", "float16"], default="int8")
+    parser.add_argument("--epochs", type=int, default=10)
+    args = parser.parse_args()
+
+    model, samples = train_cnn(args.sickle_folder, args.not_sickle_folder, epochs=args.epochs)
+    path = export_tflite(model, quantization=args.quantization, sample_images=samples)
+    print(f"CNN model saved as {path}")
@@ -0,0 +1,301 @@
+import argparse
+import atexit
+import csv
+import glob
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from process_cache import cached_resource
+
+# Columns of a submission, as in the old contact_form_submissions.csv
+CONTACT_FIELDS = ["Name", "Email", "Message"]
+
+# Write-behind limits: submissions waiting in memory, rows per disk write, seconds between writes
+MAX_PENDING = 10000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+
+# Times a batch is retried while other writers keep the database locked (each attempt waits up to
+# the 30 s connection timeout, then FLUSH_INTERVAL before the next one)
+WRITE_RETRIES = 5
+
+
+# Append-only store of contact form submissions in an SQLite database
+# WAL journaling lets staff read while the app writes, and SQLite's file lock serializes
+# writers from every Streamlit process, so no submission is lost when two arrive at once.
+# Each append is a single-row INSERT, so its cost doesn't grow with the number of submissions.
+class ContactStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.local = threading.local()
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS submissions ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, submitted_at REAL NOT NULL, "
+                "name TEXT NOT NULL, email TEXT NOT NULL, message TEXT NOT NULL)"
+            )
+
+    # Function to get this thread's connection (sqlite3 connections can't be shared between threads)
+    def _connect(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    # Function to append submissions; rows are (name, email, message) or (name, email, message, submitted_at)
+    def add_many(self, rows):
+        now = time.time()
+        rows = [(row[3] if len(row) > 3 else now, row[0], row[1], row[2]) for row in rows]
+        with self._connect() as connection:
+            connection.executemany("INSERT INTO submissions (submitted_at, name, email, message) VALUES (?, ?, ?, ?)", rows)
+
+    # Function to append one submission
+    def add(self, name, email, message):
+        self.add_many([(name, email, message)])
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    # Function to read one page of submissions in the order they arrived
+    # Pass the id of the last row of a page as after_id to get the next page; each page is an
+    # index range scan, so reading deep into a large log stays as fast as the first page
+    def read_page(self, after_id=0, page_size=100):
+        cursor = self._connect().execute(
+            "SELECT id, submitted_at, name, email, message FROM submissions WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, page_size),
+        )
+        return [dict(zip(["id", "submitted_at"] + CONTACT_FIELDS, row)) for row in cursor]
+
+    # Function to go through every submission page by page
+    def iter_pages(self, page_size=100):
+        after_id = 0
+        while True:
+            page = self.read_page(after_id, page_size)
+            if not page:
+                return
+            yield page
+            after_id = page[-1]["id"]
+
+
+# Function to copy the submissions of the old CSV file into the store, if it is still empty
+# Runs in one write transaction, so two processes starting together import the file only once
+def import_csv(store, csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = [(row["Name"], row["Email"], row["Message"]) for row in csv.DictReader(f)]
+    connection = store._connect()
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        if connection.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]:
+            return 0
+        now = time.time()
+        connection.executemany("INSERT INTO submissions (submitted_at, name, email, message) VALUES (?, ?, ?, ?)",
+                               [(now,) + row for row in rows])
+    return len(rows)
+
+
+# Function to save rows the database refused in a file of their own next to it
+# (<database>.failed.<pid>.<time>.jsonl, fsynced and renamed into place whole), so they
+# survive until replay_failed writes them into the store
+def save_failed(db_path, rows):
+    path = f"{db_path}.failed.{os.getpid()}.{time.time_ns()}.jsonl"
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(list(row)) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+# Function to write the rows saved by save_failed into the store, returning how many there were
+# Each file is claimed by renaming it, so two processes never replay the same one; the files are
+# renamed back when the store still refuses the rows
+def replay_failed(store):
+    claimed = []
+    for path in glob.glob(f"{glob.escape(store.db_path)}.failed.*.jsonl"):
+        claimed_path = f"{path}.{os.getpid()}.replay"
+        try:
+            os.replace(path, claimed_path)
+        except FileNotFoundError:
+            continue  # another process claimed it first
+        claimed.append((path, claimed_path))
+
+    rows = []
+    try:
+        for _, claimed_path in claimed:
+            with open(claimed_path, encoding="utf-8") as f:
+                rows.extend(json.loads(line) for line in f if line.strip())
+        if rows:
+            store.add_many(rows)
+    except Exception:
+        for path, claimed_path in claimed:
+            os.replace(claimed_path, path)
+        raise
+    for _, claimed_path in claimed:
+        os.remove(claimed_path)
+    return len(rows)
+
+
+# Function to open the store once per process
+# When the store is empty and legacy_csv exists, its submissions are imported first
+def load_contact_store(db_path, legacy_csv=None):
+    def load():
+        store = ContactStore(db_path)
+        if legacy_csv and os.path.exists(legacy_csv):
+            import_csv(store, legacy_csv)
+        return store
+
+    return cached_resource(("contact_store", os.path.abspath(db_path)), None, load)
+
+
+# Background writer in front of a ContactStore
+# submit() only puts the submission on a bounded in-memory queue, so the form answers at once;
+# a daemon thread writes what has queued up every FLUSH_INTERVAL seconds (or as soon as
+# BATCH_SIZE rows are waiting) in one transaction, fsynced, and drains the queue at exit.
+# A batch the database refuses is saved with save_failed and written by the next successful
+# write (see replay_failed), so a submission the form accepted is never dropped.
+# While the thread is gone or its last write failed, submit() writes directly instead, so a
+# broken database raises to the caller rather than queueing more submissions behind it.
+class ContactWriter:
+    def __init__(self, store, max_pending=MAX_PENDING, batch_size=BATCH_SIZE, interval=FLUSH_INTERVAL):
+        self.store = store
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.stopping = threading.Event()
+        self.failing = False  # the last batch couldn't be written
+        self.held = []  # rows neither the database nor the failed-rows file took, retried every interval
+        self.thread = threading.Thread(target=self._run, name="contact-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # Function to accept a submission; when the queue is full, the thread has stopped or the
+    # database is failing, it is written right away instead (raising sqlite3.Error on failure)
+    def submit(self, name, email, message):
+        row = (name, email, message, time.time())
+        if self.failing or not self.thread.is_alive():
+            self.store.add_many([row])
+            self.failing = False  # the database works again, so go back to queueing
+            return
+        try:
+            self.pending.put_nowait(row)
+        except queue.Full:
+            self.store.add_many([row])
+
+    # Function to collect the next batch: waits up to interval for the first rows, then takes
+    # whatever else is already queued (up to batch_size)
+    def _next_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self.pending.get(timeout=timeout) if timeout > 0 else self.pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    # Function to write one batch (with any held rows), retrying only while the database is locked
+    # by other writers. On any other error (read-only or corrupt file, disk I/O) the rows are saved
+    # with save_failed, or held in memory if even that fails, and the thread goes on to later batches.
+    def _write(self, batch):
+        rows = self.held + batch
+        self.held = []
+        try:
+            self._add_rows(rows)
+        except Exception as e:
+            self.failing = True
+            try:
+                path = save_failed(self.store.db_path, rows)
+                print(f"Error writing {len(rows)} contact submissions to {self.store.db_path}: {e}; "
+                      f"saved them in {path}", file=sys.stderr)
+            except OSError as save_error:
+                self.held = rows
+                print(f"Error writing {len(rows)} contact submissions to {self.store.db_path}: {e}; "
+                      f"keeping them in memory ({save_error})", file=sys.stderr)
+        else:
+            self.failing = False
+            self._replay()
+        finally:
+            for _ in batch:
+                self.pending.task_done()
+
+    # Function to add rows to the store, waiting interval seconds between attempts while it is locked
+    def _add_rows(self, rows):
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                self.store.add_many(rows)
+                return
+            except sqlite3.OperationalError as e:
+                busy = "locked" in str(e) or "busy" in str(e)
+                if not busy or attempt == WRITE_RETRIES:
+                    raise
+                time.sleep(self.interval)
+
+    # Function to write the rows of earlier failed batches, now that the database takes writes
+    def _replay(self):
+        try:
+            replay_failed(self.store)
+        except Exception as e:
+            print(f"Error replaying failed contact submissions into {self.store.db_path}: {e}", file=sys.stderr)
+
+    def _run(self):
+        # This thread's commits fsync the WAL, so a written batch survives a power cut
+        try:
+            self.store._connect().execute("PRAGMA synchronous=FULL")
+        except sqlite3.Error as e:
+            print(f"Error opening {self.store.db_path} for contact submissions: {e}", file=sys.stderr)
+        self._replay()
+        while not self.stopping.is_set() or not self.pending.empty():
+            batch = self._next_batch()
+            if batch or self.held:
+                self._write(batch)
+        # Last chance for held rows at exit; whatever is still left goes to the log
+        if self.held:
+            self._write([])
+        for row in self.held:
+            print(f"Contact submission not saved: {row}", file=sys.stderr)
+
+    # Function to wait until every accepted submission is on disk
+    def flush(self):
+        self.pending.join()
+
+    # Function to write what is left and stop the thread (run at interpreter exit)
+    def close(self):
+        self.stopping.set()
+        self.thread.join()
+
+
+# Function to get the background writer of a store once per process
+def load_contact_writer(db_path, legacy_csv=None):
+    return cached_resource(("contact_writer", os.path.abspath(db_path)), None,
+                           lambda: ContactWriter(load_contact_store(db_path, legacy_csv)))
+
+
+if __name__ == "__main__":
+    # Usage: python contact_store.py <database> [--after ID] [--page-size N] [--all]
+    # Prints submissions as CSV, one page at a time (or all of them with --all)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("database")
+    parser.add_argument("--after", type=int, default=0, help="id of the last submission already read")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--all", action="store_true")
+    args = parser.parse_args()
+
+    store = ContactStore(args.database)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["id", "submitted_at"] + CONTACT_FIELDS)
+    pages = store.iter_pages(args.page_size) if args.all else [store.read_page(args.after, args.page_size)]
+    for page in pages:
+        for row in page:
+            writer.writerow([row["id"], time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["submitted_at"]))]
+                            + [row[field] for field in CONTACT_FIELDS])
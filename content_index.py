@@ -0,0 +1,127 @@
+import hashlib
+import io
+import os
+import sys
+
+import joblib
+from PIL import Image
+
+from process_cache import cached_resource
+
+# Image types found in the dataset folders
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'tiff', 'bmp')
+
+# Default location of the saved index
+CONTENT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content_index.joblib")
+
+# Two images whose perceptual hashes differ in at most this many bits count as the same image
+MAX_HASH_DISTANCE = 3
+
+# The 64-bit perceptual hash is split into MAX_HASH_DISTANCE + 1 bands; two hashes within
+# MAX_HASH_DISTANCE bits must agree exactly on at least one band, so each band is a dict lookup
+HASH_BANDS = MAX_HASH_DISTANCE + 1
+BAND_BITS = 64 // HASH_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+# Function to compute the SHA-256 of the raw image bytes
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# Function to compute a 64-bit difference hash (dHash) that survives re-encoding and resizing
+def perceptual_hash(image):
+    small = image.convert("L").resize((9, 8), Image.BILINEAR)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def _bands(phash):
+    return [(band, (phash >> (band * BAND_BITS)) & BAND_MASK) for band in range(HASH_BANDS)]
+
+
+# Index from image content to dataset filename
+class ContentIndex:
+    def __init__(self):
+        self.by_sha = {}
+        self.by_band = {}
+
+    def __len__(self):
+        return len(self.by_sha)
+
+    # Function to add one image's bytes under its dataset filename
+    def add(self, data, filename):
+        sha = content_hash(data)
+        if sha in self.by_sha:
+            return
+        self.by_sha[sha] = filename
+        phash = perceptual_hash(Image.open(io.BytesIO(data)))
+        for key in _bands(phash):
+            self.by_band.setdefault(key, []).append((phash, filename))
+
+    # Function to find the dataset filename for an image, by exact bytes first and then by near-duplicate
+    #   image: the image already decoded (at any resolution, the hash is taken at 9 x 8 pixels),
+    #          so the bytes don't have to be decoded again at full resolution
+    def lookup(self, data, image=None):
+        filename = self.by_sha.get(content_hash(data))
+        if filename is not None:
+            return filename
+
+        try:
+            phash = perceptual_hash(image if image is not None else Image.open(io.BytesIO(data)))
+        except Exception:
+            return None
+        best_filename, best_distance = None, MAX_HASH_DISTANCE + 1
+        for key in _bands(phash):
+            for candidate, candidate_filename in self.by_band.get(key, ()):
+                distance = bin(phash ^ candidate).count("1")
+                if distance < best_distance:
+                    best_filename, best_distance = candidate_filename, distance
+        return best_filename
+
+
+# Function to build an index over every image in the given dataset folders
+def build_content_index(folder_paths):
+    index = ContentIndex()
+    for folder_path in folder_paths:
+        for filename in sorted(os.listdir(folder_path)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                try:
+                    with open(os.path.join(folder_path, filename), "rb") as f:
+                        index.add(f.read(), filename)
+                except Exception as e:
+                    print(f"Error indexing file {filename}: {e}")
+    return index
+
+
+# Function to save an index (as plain dicts, so it loads without this module's class path)
+def save_content_index(index, path=CONTENT_INDEX_PATH):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump((index.by_sha, index.by_band), tmp_path)
+    os.replace(tmp_path, path)
+
+
+# Function to load a saved index once per process, returning None when it has not been built
+def load_content_index(path=CONTENT_INDEX_PATH):
+    if not os.path.exists(path):
+        return None
+
+    def load():
+        index = ContentIndex()
+        index.by_sha, index.by_band = joblib.load(path)
+        return index
+
+    return cached_resource(("content_index", os.path.abspath(path)), os.path.getmtime(path), load)
+
+
+if __name__ == "__main__":
+    # Usage: python content_index.py <dataset folder> [<dataset folder> ...]
+    index = build_content_index(sys.argv[1:])
+    save_content_index(index)
+    print(f"Indexed {len(index)} images into {CONTENT_INDEX_PATH}")
@@ -1,45 +1,4 @@
-import os
-import pandas as pd
-from PIL import Image
-import random
-
-# Define a function to process images and extract the required features
-def process_images(folder_path):
-    # Initialize an empty list to store the results
-    results = []
-
-    # Loop through each file in the folder
-    for filename in os.listdir(folder_path):
-        if filename.lower().endswith(('png', 'jpg', 'jpeg', 'tiff', 'bmp')):  # Check for valid image file types
-            file_path = os.path.join(folder_path, filename)
-
-            try:
-                # Open the image (just to confirm it's valid, no actual processing here)
-                image = Image.open(file_path)
-
-                # Generate random values for the features (replace with real logic if available)
-                total_rbcs = round(random.uniform(4.0, 6.5), 2)  # Random value for Total RBCs (in millions)
-                sickled_cells = round(random.uniform(5.0, 25.0), 2)  # Random value for Sickled Cells (%)
-                normocytes = round(random.uniform(60.0, 80.0), 2)  # Random value for Normocytes (%)
-                target_cells = round(random.uniform(2.0, 10.0), 2)  # Random value for Target Cells (%)
-                anisocytosis_severity = random.choice(["Mild", "Moderate", "Severe"])  # Random severity
-                reticulocytes = round(random.uniform(10.0, 20.0), 2)  # Random value for Reticulocytes (%)
-
-                # Append the data as a dictionary to the results list
-                results.append({
-                    "Filename": filename,
-                    "Total RBCs (in millions)": total_rbcs,
-                    "Sickled Cells (%)": sickled_cells,
-                    "Normocytes (%)": normocytes,
-                    "Target Cells (%)": target_cells,
-                    "Anisocytosis Severity": anisocytosis_severity,
-                    "Reticulocytes (%)": reticulocytes,
-                    "Sickle Cell": "YES"  # Default value for Sickle Cell
-                })
-            except Exception as e:
-                print(f"Error processing file {filename}: {e}")
-
-    return results
+from feature_extraction import iter_features, update_features, write_features
 
 data = {
     "Total RBCs (in millions)": 4.2,  # Normal range is typically 4.1–5.5 million/μL; often lower in sickle cell disease.
@@ -54,14 +13,22 @@ data = {
 # Path to the folder containing extracted images
 folder_path = "C:/Users/shank/Desktop/ENGG PROJECTS/MAJOR PROJECT MAIN/FINALPROJECT/DATA/Positive/Unlabelled/output"  # Replace with the path to the extracted folder
 
-# Process the images
-data = process_images(folder_path)
+# Number of worker processes used for extraction (None uses every core)
+workers = None
 
-# Convert the data to a Pandas DataFrame
-df = pd.DataFrame(data)
+# Only extract new or changed images, keeping a manifest next to the CSV (False rebuilds everything)
+incremental = True
 
-# Save the DataFrame to a CSV file
+# Output CSV file
 output_csv = "image_features_SCD.csv"
-df.to_csv(output_csv, index=False)
 
-print(f"CSV file saved as {output_csv}")
+if __name__ == "__main__":
+    if incremental:
+        added, changed, removed = update_features(folder_path, "YES", output_csv, workers=workers)
+        print(f"CSV file updated: {added} added, {changed} changed, {removed} removed")
+    else:
+        # Stream the rows to the output in chunks (a .parquet output name writes Parquet instead)
+        rows = iter_features(folder_path, "YES", workers=workers)  # Default value for Sickle Cell
+        written = write_features(rows, output_csv)
+
+        print(f"CSV file saved as {output_csv} ({written} images)")
@@ -0,0 +1,22 @@
+from model_registry import FEATURES
+
+# Bar colour of each feature
+FEATURE_COLORS = ['red', 'blue', 'green', 'purple']
+
+
+# Function to build the Vega-Lite spec of the feature percentages bar graph
+# The browser draws the chart, so the server only builds this small dict (no matplotlib figure,
+# no shared pyplot state) and the spec can be cached along with the prediction
+def feature_chart_spec(row):
+    return {
+        "title": "Cell Features Percentage",
+        "height": 250,
+        "data": {"values": [{"Features": feature, "Percentage": float(row[feature])} for feature in FEATURES]},
+        "mark": "bar",
+        "encoding": {
+            "y": {"field": "Features", "type": "nominal", "sort": FEATURES},
+            "x": {"field": "Percentage", "type": "quantitative", "scale": {"domain": [0, 100]}},
+            "color": {"field": "Features", "type": "nominal", "legend": None,
+                      "scale": {"domain": FEATURES, "range": FEATURE_COLORS}},
+        },
+    }
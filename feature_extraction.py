@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import shutil
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+import pandas as pd
+from PIL import Image
+
+from cell_morphology import analyze_smear
+from feature_store import optimize_dtypes
+from lazy_imports import load_backend
+
+# Image types picked up from the dataset folders
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'tiff', 'bmp')
+
+
+# Function to yield the image files in a folder without building the whole listing in memory
+def iter_images(folder_path):
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file():
+                yield entry.path
+
+
+# Function to list the image files in a folder
+def list_images(folder_path):
+    return list(iter_images(folder_path))
+
+
+# Function to extract the features of one image, returning None if the image can't be processed
+def extract_features(file_path, label):
+    filename = os.path.basename(file_path)
+    try:
+        with Image.open(file_path) as image:
+            features = analyze_smear(image.convert("RGB"))
+        return {"Filename": filename, **features, "Sickle Cell": label}
+    except Exception as e:
+        print(f"Error processing file {filename}: {e}")
+        return None
+
+
+# Function run inside a worker process: extract a whole chunk of images in one task
+def _extract_chunk(file_paths, label):
+    return [extract_features(file_path, label) for file_path in file_paths]
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Function to yield the feature rows of every image in a folder
+#   workers:   number of processes (1 runs in this process, None uses every core)
+#   chunksize: number of images sent to a worker per task
+#   ordered:   yield rows in folder order (True) or as soon as each chunk finishes (False)
+def iter_features(folder_path, label, workers=1, chunksize=64, ordered=True):
+    return _iter_rows(iter_images(folder_path), label, workers, chunksize, ordered)
+
+
+def _iter_rows(file_paths, label, workers=1, chunksize=64, ordered=True):
+    if workers == 1:
+        for file_path in file_paths:
+            row = extract_features(file_path, label)
+            if row is not None:
+                yield row
+        return
+
+    workers = workers or os.cpu_count()
+    max_pending = workers * 2  # keep every worker busy without queueing the whole folder
+    chunks = _chunks(file_paths, chunksize)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(_extract_chunk, chunk, label) for chunk in islice(chunks, max_pending))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                for row in future.result():
+                    if row is not None:
+                        yield row
+                for chunk in islice(chunks, 1):
+                    pending.append(pool.submit(_extract_chunk, chunk, label))
+
+
+# Function to write feature rows to a CSV or Parquet file (chosen by extension) in chunks,
+# so only chunk_rows rows are held in memory however many images are processed
+def write_features(rows, output_path, chunk_rows=1000):
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    parquet = output_path.lower().endswith(".parquet")
+    if parquet:
+        pa = load_backend("pyarrow")
+        pq = load_backend("pyarrow.parquet")
+    writer = None
+    written = 0
+    try:
+        for chunk in _chunks(rows, chunk_rows):
+            df = pd.DataFrame(chunk)
+            if parquet:
+                # float32 numerics and dictionary-encoded text columns, the same types in every chunk
+                df = optimize_dtypes(df)
+                if writer is None:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                else:
+                    table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+            else:
+                df.to_csv(tmp_path, mode="a" if written else "w", header=not written, index=False)
+            written += len(chunk)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if writer is not None:
+        writer.close()
+    if written:
+        os.replace(tmp_path, output_path)
+    return written
+
+
+# Function to process images and extract the required features into a list of rows
+def process_images(folder_path, label, workers=1, chunksize=64, ordered=True):
+    return list(iter_features(folder_path, label, workers=workers, chunksize=chunksize, ordered=ordered))
+
+
+# Function to hash a file's contents
+def file_hash(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+# Function to return the size and mtime of the output file, or None when it doesn't exist
+def _output_stamp(output_path):
+    if not os.path.exists(output_path):
+        return None
+    stat = os.stat(output_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+# Function to load a manifest: (image entries, stamp of the output file they were written to)
+def _load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return {}, None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    # Older manifests hold only the image entries
+    if "images" not in manifest:
+        return manifest, None
+    return manifest["images"], manifest["output"]
+
+
+def _save_manifest(images, output_stamp, manifest_path):
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"images": images, "output": output_stamp}, f)
+    os.replace(tmp_path, manifest_path)
+
+
+# Function to write feature rows to a CSV through a temporary file, so a crash never leaves it half-written
+#   append: add the rows to a copy of the current CSV instead of writing them as the whole table
+def _replace_csv(rows, output_csv, append=False):
+    tmp_path = f"{output_csv}.{os.getpid()}.tmp"
+    try:
+        if append:
+            shutil.copyfile(output_csv, tmp_path)
+        pd.DataFrame(rows).to_csv(tmp_path, mode="a" if append else "w", header=not append, index=False)
+        os.replace(tmp_path, output_csv)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Function to bring a feature CSV (or Parquet file) up to date, extracting only new or changed images
+# The manifest (output_csv + ".manifest.json" by default) maps each filename to its
+# size, mtime, content hash and feature row; returns (added, changed, removed) counts
+# The CSV is replaced before the manifest is saved, and the manifest records the CSV it was saved
+# with, so after a crash between the two the next run rewrites the CSV instead of appending to it
+def update_features(folder_path, label, output_csv, manifest_path=None, workers=1, chunksize=64):
+    manifest_path = manifest_path or f"{output_csv}.manifest.json"
+    manifest, output_stamp = _load_manifest(manifest_path)
+    # Unless the CSV is the one the manifest was saved with, it can't be appended to safely,
+    # so it is rewritten from the manifest
+    rewrite = output_stamp is None or output_stamp != _output_stamp(output_csv)
+
+    # Compare every image with its manifest entry: size and mtime first, then the content hash
+    current = {}
+    to_extract = []
+    changed = 0
+    for file_path in list_images(folder_path):
+        filename = os.path.basename(file_path)
+        stat = os.stat(file_path)
+        entry = manifest.get(filename)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            current[filename] = entry
+            continue
+
+        sha = file_hash(file_path)
+        if entry is not None and entry["sha256"] == sha:
+            current[filename] = dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            continue
+
+        changed += entry is not None
+        current[filename] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha, "row": None}
+        to_extract.append(file_path)
+
+    removed = len(set(manifest) - set(current))
+
+    new_rows = []
+    for row in _iter_rows(to_extract, label, workers, chunksize):
+        current[row["Filename"]]["row"] = row
+        new_rows.append(row)
+    # Images that failed to extract are left out of the manifest so the next run retries them
+    current = {filename: entry for filename, entry in current.items() if entry["row"] is not None}
+
+    if output_csv.lower().endswith(".parquet"):
+        # A Parquet file can't be appended to: rewrite it from the manifest whenever anything changed
+        # (write_features leaves the old file in place when there are no rows left, so it is removed)
+        if changed or removed or rewrite or new_rows:
+            if not write_features((entry["row"] for entry in current.values()), output_csv) and os.path.exists(output_csv):
+                os.remove(output_csv)
+    elif changed or removed or rewrite:
+        # Rows were replaced or dropped: rewrite the CSV from the manifest
+        _replace_csv([entry["row"] for entry in current.values()], output_csv)
+    elif new_rows:
+        # Only new images: append their rows to the existing CSV
+        _replace_csv(new_rows, output_csv, append=True)
+
+    _save_manifest(current, _output_stamp(output_csv), manifest_path)
+    return len(new_rows) - changed, changed, removed
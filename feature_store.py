@@ -0,0 +1,210 @@
+import argparse
+import os
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from process_cache import cached_resource
+
+# Columns of the feature tables written by data_fetch_SCD.py / data_fetch_NSCD.py
+NUMERIC_COLUMNS = ['Total RBCs (in millions)', 'Sickled Cells (%)', 'Normocytes (%)',
+                   'Target Cells (%)', 'Reticulocytes (%)']
+SEVERITY_LEVELS = ['Mild', 'Moderate', 'Severe']
+LABEL_LEVELS = ['NO', 'YES']
+
+# Arrays written by FeatureStore.export_mmap, one .npy file each
+MMAP_ARRAYS = ['filenames', 'numeric', 'severity', 'labels']
+
+
+# One row of the feature table
+class FeatureRecord(NamedTuple):
+    filename: str
+    total_rbcs: float
+    sickled_cells: float
+    normocytes: float
+    target_cells: float
+    anisocytosis_severity: str
+    reticulocytes: float
+    sickle_cell: bool
+
+    # Return the record keyed by the original CSV column names
+    def as_dict(self):
+        return {
+            "Filename": self.filename,
+            "Total RBCs (in millions)": self.total_rbcs,
+            "Sickled Cells (%)": self.sickled_cells,
+            "Normocytes (%)": self.normocytes,
+            "Target Cells (%)": self.target_cells,
+            "Anisocytosis Severity": self.anisocytosis_severity,
+            "Reticulocytes (%)": self.reticulocytes,
+            "Sickle Cell": "YES" if self.sickle_cell else "NO",
+        }
+
+
+# Function to convert a feature table to compact types: float32 numerics and categorical text columns
+def optimize_dtypes(data):
+    data = data.copy()
+    for column in NUMERIC_COLUMNS:
+        if column in data:
+            data[column] = data[column].astype(np.float32)
+    if 'Anisocytosis Severity' in data:
+        data['Anisocytosis Severity'] = pd.Categorical(data['Anisocytosis Severity'], categories=SEVERITY_LEVELS)
+    if 'Sickle Cell' in data:
+        data['Sickle Cell'] = pd.Categorical(data['Sickle Cell'], categories=LABEL_LEVELS)
+    return data
+
+
+# Function to return the Parquet copy of a feature CSV when it is up to date, otherwise the CSV itself
+def columnar_path(csv_path):
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    if os.path.exists(parquet_path) and (not os.path.exists(csv_path)
+                                         or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        return parquet_path
+    return csv_path
+
+
+# Function to read a feature table (CSV or Parquet), loading only the given columns
+def read_feature_table(path, columns=None):
+    if path.lower().endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return optimize_dtypes(pd.read_csv(path, usecols=columns))
+
+
+# Function to write a feature table as Parquet with dictionary-encoded text columns
+def write_parquet(data, parquet_path):
+    optimize_dtypes(data).to_parquet(parquet_path, index=False)
+
+
+# Column store of image features with an O(1) filename index
+# Columns left out of the loaded table are NaN (numbers) or "" (severity) in the records.
+# A store opened with open_mmap instead reads memory-mapped arrays sorted by filename
+# and finds filenames by binary search, so it needs no per-process index at all.
+class FeatureStore:
+    def __init__(self, data):
+        self.filenames = data['Filename'].to_numpy(dtype=object)
+        self.numeric = np.full((len(data), len(NUMERIC_COLUMNS)), np.nan, dtype=np.float32)
+        for position, column in enumerate(NUMERIC_COLUMNS):
+            if column in data:
+                self.numeric[:, position] = data[column].to_numpy(dtype=np.float32)
+        if 'Anisocytosis Severity' in data:
+            self.severity = pd.Categorical(data['Anisocytosis Severity'], categories=SEVERITY_LEVELS).codes.astype(np.int8)
+        else:
+            self.severity = np.full(len(data), -1, dtype=np.int8)
+        self.labels = (data['Sickle Cell'] == 'YES').to_numpy()
+
+        # Build the filename index, keeping the first row when a filename repeats
+        self.index = {}
+        for position, filename in enumerate(self.filenames):
+            self.index.setdefault(filename, position)
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __contains__(self, filename):
+        return self._position(filename) is not None
+
+    # Function to open a store exported with export_mmap; the arrays are mapped read-only,
+    # so every process using the folder shares one copy in the OS page cache
+    @classmethod
+    def open_mmap(cls, folder):
+        store = cls.__new__(cls)
+        for name in MMAP_ARRAYS:
+            setattr(store, name, np.load(os.path.join(folder, f"{name}.npy"), mmap_mode='r'))
+        store.index = None
+        return store
+
+    # Function to export the store as .npy arrays (sorted by filename) for open_mmap
+    def export_mmap(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        filenames = np.array([str(filename).encode() for filename in self.filenames])
+        # np.unique sorts the filenames and keeps the first row of each repeated filename
+        filenames, first = np.unique(filenames, return_index=True)
+        arrays = {"filenames": filenames, "numeric": self.numeric[first],
+                  "severity": self.severity[first], "labels": self.labels[first]}
+        # filenames.npy is replaced last: load_mmap_store reloads when it changes, so a reader that
+        # opened the folder mid-export (new arrays, old filenames) is reloaded once the export is done
+        for name in sorted(MMAP_ARRAYS, key=lambda name: name == "filenames"):
+            path = os.path.join(folder, f"{name}.npy")
+            tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, np.ascontiguousarray(arrays[name]))
+            os.replace(tmp_path, path)
+
+    # Function to find the row position of a filename, or None
+    def _position(self, filename):
+        if self.index is not None:
+            return self.index.get(filename)
+        key = filename.encode()
+        if len(key) > self.filenames.dtype.itemsize:
+            return None
+        position = int(np.searchsorted(self.filenames, key))
+        if position < len(self.filenames) and self.filenames[position] == key:
+            return position
+        return None
+
+    # Function to build the record stored at a row position
+    def record_at(self, position):
+        # float32 keeps ~7 significant digits; rounding restores the 2-decimal values from the CSVs
+        total_rbcs, sickled_cells, normocytes, target_cells, reticulocytes = [
+            round(value, 4) for value in self.numeric[position].tolist()]
+        severity_code = self.severity[position]
+        filename = self.filenames[position]
+        return FeatureRecord(
+            filename=filename.decode() if isinstance(filename, bytes) else filename,
+            total_rbcs=total_rbcs,
+            sickled_cells=sickled_cells,
+            normocytes=normocytes,
+            target_cells=target_cells,
+            anisocytosis_severity=SEVERITY_LEVELS[severity_code] if severity_code >= 0 else "",
+            reticulocytes=reticulocytes,
+            sickle_cell=bool(self.labels[position]),
+        )
+
+    # Function to look up a filename, returning None when it is not in the dataset
+    def get(self, filename):
+        position = self._position(filename)
+        if position is None:
+            return None
+        return self.record_at(position)
+
+    # Function to return the feature matrix (one row per image) for the given columns
+    def feature_matrix(self, columns):
+        return self.numeric[:, [NUMERIC_COLUMNS.index(column) for column in columns]]
+
+
+# Function to load the feature tables into a store, once per process until a file changes
+#   columns: columns to read (None reads them all); Filename and Sickle Cell are always needed
+def load_feature_store(paths, columns=None):
+    paths = tuple(os.path.abspath(path) for path in paths)
+    stamp = tuple((os.path.getmtime(path), os.path.getsize(path)) for path in paths)
+
+    def load():
+        return FeatureStore(pd.concat([read_feature_table(path, columns) for path in paths], ignore_index=True))
+
+    return cached_resource(("feature_store", paths, tuple(columns) if columns else None), stamp, load)
+
+
+# Function to open a memory-mapped store once per process until it is exported again
+def load_mmap_store(folder):
+    folder = os.path.abspath(folder)
+    stamp = os.path.getmtime(os.path.join(folder, "filenames.npy"))
+    return cached_resource(("mmap_store", folder), stamp, lambda: FeatureStore.open_mmap(folder))
+
+
+if __name__ == "__main__":
+    # Usage: python feature_store.py [--mmap <folder>] <feature CSV> [<feature CSV> ...]
+    # Writes a Parquet copy next to each CSV, which the prediction page then reads instead,
+    # and with --mmap also exports the combined tables as memory-mapped arrays
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mmap", help="folder to export the memory-mapped feature arrays to")
+    parser.add_argument("csv_paths", nargs="+")
+    args = parser.parse_args()
+
+    for csv_path in args.csv_paths:
+        parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+        write_parquet(pd.read_csv(csv_path), parquet_path)
+        print(f"Parquet file saved as {parquet_path}")
+
+    if args.mmap:
+        load_feature_store(args.csv_paths).export_mmap(args.mmap)
+        print(f"Memory-mapped feature arrays saved in {args.mmap}")
@@ -0,0 +1,41 @@
+import io
+from typing import NamedTuple
+
+from PIL import Image
+
+# Uploads are decoded with their longest side no larger than this (the resolution the
+# quality check and cell analysis work at), so 20+ MP microscope captures cost no more than 1 MP
+ANALYSIS_MAX_SIDE = 1024
+
+# Longest side of the preview shown on the page
+DISPLAY_MAX_SIDE = 640
+
+
+# Uploaded image decoded at analysis resolution
+class DecodedImage(NamedTuple):
+    image: Image.Image  # RGB, longest side at most the requested size
+    original_size: tuple  # (width, height) of the uploaded file
+
+
+# Function to decode image bytes at reduced resolution
+# JPEGs use draft mode, so libjpeg decodes straight to 1/2, 1/4 or 1/8 scale instead of
+# building the full-resolution bitmap; the remaining step down is a cheap resize
+def decode_image(data, max_side=ANALYSIS_MAX_SIDE):
+    image = Image.open(io.BytesIO(data))
+    original_size = image.size
+    scale = max_side / max(original_size)
+    if scale < 1:
+        image.draft("RGB", (max(1, round(original_size[0] * scale)), max(1, round(original_size[1] * scale))))
+    image = image.convert("RGB")
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.BILINEAR)
+    return DecodedImage(image, original_size)
+
+
+# Function to make the JPEG preview sent to the browser instead of the original upload
+def display_thumbnail(image, max_side=DISPLAY_MAX_SIDE):
+    preview = image.copy()
+    preview.thumbnail((max_side, max_side), Image.BILINEAR)
+    buffer = io.BytesIO()
+    preview.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
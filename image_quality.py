@@ -0,0 +1,93 @@
+import numpy as np
+from PIL import Image
+
+# Minimum image quality accepted for prediction
+MIN_WIDTH = 50
+MIN_HEIGHT = 100
+MIN_BRIGHTNESS = 50
+MIN_SHARPNESS = 10
+
+# Brightness and sharpness are measured on a grayscale copy no larger than this
+QUALITY_MAX_SIDE = 1024
+
+# Bins of the exposure histogram (a divisor of 256)
+HISTOGRAM_BINS = 16
+
+# Message shown for each quality problem
+QUALITY_MESSAGES = {
+    "low_resolution": "Uploaded image resolution is too low. Please upload a higher resolution image.",
+    "too_dark": "Uploaded image is too dark. Please upload a brighter image.",
+    "too_blurry": "Uploaded image is too blurry. Please upload a sharper image.",
+    "unreadable": "Uploaded file could not be read as an image. Please upload a JPG or PNG image.",
+    "no_cells": "No blood cells were found in the uploaded image. Please upload a clear blood smear image.",
+    "not_in_dataset": "Filename not found in the dataset. Please ensure the uploaded image matches the dataset.",
+}
+
+
+# Function to convert an image to grayscale once, scaled down to QUALITY_MAX_SIDE
+def _quality_gray(image):
+    gray = image.convert("L")
+    scale = QUALITY_MAX_SIDE / max(gray.size)
+    if scale < 1:
+        gray = gray.resize((max(1, round(gray.width * scale)), max(1, round(gray.height * scale))), Image.BILINEAR)
+    return np.asarray(gray)
+
+
+# Function to measure one grayscale image (uint8, H x W) in one vectorized pass:
+# mean brightness, variance of the 4-neighbour Laplacian (sharpness) and the exposure histogram
+def _measure(gray):
+    brightness = gray.mean() if gray.size else 0.0
+
+    # Laplacian of the interior pixels, same kernel as cv2.Laplacian with ksize=1
+    pixels = gray.astype(np.float32)
+    laplacian = pixels[:-2, 1:-1] + pixels[2:, 1:-1] + pixels[1:-1, :-2] + pixels[1:-1, 2:] - 4 * pixels[1:-1, 1:-1]
+    sharpness = laplacian.var() if laplacian.size else 0.0
+
+    # 256 gray levels counted once, then summed into HISTOGRAM_BINS equal bins
+    counts = np.bincount(gray.ravel(), minlength=256)
+    histogram = counts.reshape(HISTOGRAM_BINS, -1).sum(axis=1) / max(gray.size, 1)
+    return brightness, sharpness, histogram
+
+
+# Function to turn the measurements of one image into its quality report
+def _report(size, brightness, sharpness, histogram):
+    width, height = size
+    if width < MIN_WIDTH or height < MIN_HEIGHT:
+        problem = "low_resolution"
+    elif brightness < MIN_BRIGHTNESS:
+        problem = "too_dark"
+    elif sharpness < MIN_SHARPNESS:
+        problem = "too_blurry"
+    else:
+        problem = None
+    return {
+        "width": width,
+        "height": height,
+        "brightness": float(brightness),
+        "sharpness": float(sharpness),
+        # 0 for a sharp image, approaching 1 as the image gets blurrier
+        "blur_score": float(MIN_SHARPNESS / (MIN_SHARPNESS + sharpness)),
+        "histogram": histogram.tolist(),
+        "underexposed": float(histogram[0]),  # share of pixels in the darkest bin
+        "overexposed": float(histogram[-1]),  # share of pixels in the brightest bin
+        "problem": problem,
+    }
+
+
+# Function to check image clarity (resolution, brightness, sharpness, exposure) for a batch of images
+# Images are measured one at a time, so memory stays at one analysis-size image however large the batch
+# sizes: original (width, height) of each image when it was decoded at reduced resolution
+def assess_quality_batch(images, sizes=None):
+    sizes = sizes or [image.size for image in images]
+    return [_report(size, *_measure(_quality_gray(image))) for image, size in zip(images, sizes)]
+
+
+# Function to check the clarity of one image
+def assess_quality(image, size=None):
+    return assess_quality_batch([image], [size or image.size])[0]
+
+
+# Function to check image clarity: resolution, brightness, and sharpness
+# Returns the key of the first problem found (see QUALITY_MESSAGES), or None for a usable image
+def check_quality(image, size=None):
+    return assess_quality(image, size)["problem"]
@@ -0,0 +1,45 @@
+import importlib
+import subprocess
+import sys
+import time
+
+# Heavy modules the app can load lazily, as listed by the startup report
+BACKENDS = ['tensorflow', 'cv2', 'sklearn.ensemble', 'pyarrow',
+            'pandas', 'numpy', 'PIL.Image', 'streamlit']
+
+# Seconds spent importing each backend in this process
+_import_times = {}
+
+
+# Function to import a module the first time a code path needs it, recording how long it took
+def load_backend(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_times.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+# Function to list the backends imported so far in this process, slowest first
+def import_report():
+    return sorted(_import_times.items(), key=lambda item: item[1], reverse=True)
+
+
+# Function to measure the cold import time of each module in a fresh interpreter
+def startup_report(modules=BACKENDS):
+    report = []
+    for name in modules:
+        code = f"import time; start = time.perf_counter(); import {name}; print(time.perf_counter() - start)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        seconds = float(result.stdout.strip()) if result.returncode == 0 else None
+        report.append((name, seconds))
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python lazy_imports.py [module ...]
+    for name, seconds in startup_report(sys.argv[1:] or BACKENDS):
+        print(f"{name:<20} {'not installed' if seconds is None else f'{seconds * 1000:8.1f} ms'}")
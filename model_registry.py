@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import pandas as pd
+
+from feature_store import read_feature_table
+from lazy_imports import load_backend
+from process_cache import cached_resource
+
+# Features used by the sickle cell classifier
+FEATURES = ['Sickled Cells (%)', 'Normocytes (%)', 'Target Cells (%)', 'Reticulocytes (%)']
+
+# Whether uploads that aren't in the dataset are measured with cell_morphology.analyze_smear and
+# classified by the model. Off until the feature CSVs are regenerated with analyze_smear
+# (data_fetch_SCD.py / data_fetch_NSCD.py) and the model is retrained on them: the committed CSVs
+# hold placeholder values, so the model's answers on real measurements mean nothing.
+CLASSIFY_MEASURED = False
+
+# Default hyperparameters for the RandomForest and the train/test split
+DEFAULT_PARAMS = {"random_state": 42}
+TEST_SIZE = 0.25
+SPLIT_SEED = 42
+
+# Folder where trained models are saved, one file per data + hyperparameter fingerprint
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+# File hashes already computed in this process, by (path, size, mtime)
+_file_digests = {}
+
+
+# Function to hash a file, reusing the previous hash while its size and mtime are unchanged
+def _file_digest(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _file_digests.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        _file_digests[key] = digest
+    return digest
+
+
+# Function to compute the fingerprint of the training data and hyperparameters
+def compute_fingerprint(csv_paths, params=None):
+    params = dict(DEFAULT_PARAMS if params is None else params)
+    sha = hashlib.sha256()
+    for path in csv_paths:
+        sha.update(_file_digest(path).encode())
+    settings = {"params": params, "features": FEATURES, "test_size": TEST_SIZE, "split_seed": SPLIT_SEED}
+    sha.update(json.dumps(settings, sort_keys=True).encode())
+    return sha.hexdigest()[:16]
+
+
+def _model_path(fingerprint):
+    return os.path.join(MODEL_DIR, f"random_forest-{fingerprint}.joblib")
+
+
+# Function to train a RandomForest on the feature tables (CSV or Parquet)
+def train_model(csv_paths, params=None):
+    # scikit-learn's training modules are only needed here, not when a saved model is loaded
+    RandomForestClassifier = load_backend("sklearn.ensemble").RandomForestClassifier
+    accuracy_score = load_backend("sklearn.metrics").accuracy_score
+    train_test_split = load_backend("sklearn.model_selection").train_test_split
+
+    params = dict(DEFAULT_PARAMS if params is None else params)
+    columns = FEATURES + ['Sickle Cell']
+    data_combined = pd.concat([read_feature_table(path, columns) for path in csv_paths])
+
+    X = data_combined[FEATURES]
+    y = data_combined['Sickle Cell'].apply(lambda x: 1 if x == 'YES' else 0)  # Encode 'YES' as 1 and 'NO' as 0
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=SPLIT_SEED)
+
+    clf = RandomForestClassifier(**params)
+    clf.fit(X_train, y_train)
+
+    metadata = {
+        "params": params,
+        "features": FEATURES,
+        "sources": [os.path.basename(path) for path in csv_paths],
+        "rows": int(len(data_combined)),
+        "accuracy": float(accuracy_score(y_test, clf.predict(X_test))),
+        "trained_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return clf, metadata
+
+
+# Function to save a trained model and its metadata under its fingerprint
+def save_model(clf, metadata, fingerprint):
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    path = _model_path(fingerprint)
+    metadata = dict(metadata, fingerprint=fingerprint)
+
+    # Write to a temporary file first so other processes never load a half-written model
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(clf, tmp_path)
+    os.replace(tmp_path, path)
+    with open(path.replace(".joblib", ".json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+    return path
+
+
+# Function to return the model for the given data, training it only when the fingerprint is new
+def load_model(csv_paths, params=None):
+    fingerprint = compute_fingerprint(csv_paths, params)
+
+    def load():
+        path = _model_path(fingerprint)
+        if os.path.exists(path):
+            return joblib.load(path)
+        clf, metadata = train_model(csv_paths, params)
+        save_model(clf, metadata, fingerprint)
+        return clf
+
+    # The fingerprint covers the data and hyperparameters, so a cached model never goes stale
+    return cached_resource(("model", fingerprint), None, load)
+
+
+if __name__ == "__main__":
+    # Train (or reuse) the model for the feature CSVs in the project folder
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.join(project_dir, "image_features_NOTSICKLE.csv"),
+             os.path.join(project_dir, "image_features_SICKLE.csv")]
+    fingerprint = compute_fingerprint(paths)
+    load_model(paths)
+    print(f"Model ready: {_model_path(fingerprint)}")
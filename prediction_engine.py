@@ -0,0 +1,137 @@
+import os
+
+import pandas as pd
+
+from batch_predict import predict_batch
+from cnn_model import CNN_MODEL_PATH, require_cnn_classifier
+from content_index import CONTENT_INDEX_PATH, load_content_index
+from feature_store import columnar_path, load_feature_store, load_mmap_store
+from image_decode import decode_image
+from image_quality import check_quality
+from lazy_imports import load_backend
+from model_registry import CLASSIFY_MEASURED, FEATURES, load_model
+from process_cache import cached_resource
+from treatment_rules import choose_treatment, evaluate_sickle_cell
+
+# Feature tables in the project folder
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FEATURE_PATHS = [os.path.join(PROJECT_DIR, "image_features_NOTSICKLE.csv"),
+                         os.path.join(PROJECT_DIR, "image_features_SICKLE.csv")]
+
+
+# Prediction engine: the feature store, trained model and content index behind one predict() call
+# Each of them comes from its own per-process cache, which reloads it when its files change
+class PredictionEngine:
+    def __init__(self, feature_paths, shared_features_dir=None):
+        self.feature_paths = feature_paths
+        self.shared_features_dir = shared_features_dir
+
+    @property
+    def feature_store(self):
+        if self.shared_features_dir:
+            return load_mmap_store(self.shared_features_dir)
+        return load_feature_store(self.feature_paths, columns=['Filename'] + FEATURES + ['Sickle Cell'])
+
+    @property
+    def content_index(self):
+        return load_content_index()
+
+    @property
+    def clf(self):
+        return load_model(self.feature_paths)
+
+    # Function to return a stamp of the engine's files; it changes whenever a loader would reload
+    # (used to key cached results). The feature tables count in every mode, since the model is
+    # trained on them even when the records come from the shared arrays.
+    def version(self):
+        paths = list(self.feature_paths) + [CONTENT_INDEX_PATH, CNN_MODEL_PATH]
+        if self.shared_features_dir:
+            paths.append(os.path.join(self.shared_features_dir, "filenames.npy"))
+        stamps = []
+        for path in paths:
+            stat = os.stat(path) if os.path.exists(path) else None
+            stamps.append((stat.st_mtime_ns, stat.st_size) if stat else None)
+        return tuple(stamps)
+
+    # Function to predict sickle cell status based on filename
+    def predict_sickle_cell(self, filename):
+        record = self.feature_store.get(filename)
+        if record is None:
+            return "Filename not found in the dataset. Please ensure the uploaded image matches the dataset."
+        return 'SICKLE CELL' if record.sickle_cell else 'NOT SICKLE CELL'
+
+    # Function to classify measured cell features with the trained model
+    def classify_features(self, row):
+        prediction = self.clf.predict(pd.DataFrame([row])[FEATURES])[0]
+        return 'SICKLE CELL' if prediction == 1 else 'NOT SICKLE CELL'
+
+    # Function to run the whole flow for one image: quality check, features, prediction, evaluation
+    # Returns a JSON-friendly dict; "prediction" is None when the image can't be classified
+    # decoded: the upload already decoded with image_decode.decode_image, if the caller has it
+    # Raises FileNotFoundError when use_cnn is set but the CNN hasn't been exported
+    def predict(self, name, data, use_cnn=False, decoded=None):
+        cnn = require_cnn_classifier() if use_cnn else None
+        result = {"image": name, "quality": "ok", "source": None, "features": None, "prediction": None,
+                  "sickle_cell_detected": False, "reasons": [], "treatment": None, "precaution": None}
+        if decoded is None:
+            try:
+                decoded = decode_image(data)
+            except Exception:
+                result["quality"] = "unreadable"
+                return result
+        image = decoded.image
+
+        problem = check_quality(image, decoded.original_size)
+        if problem is not None:
+            result["quality"] = problem
+            return result
+
+        # Find the dataset filename by image content, falling back to the uploaded filename
+        filename = name
+        content_index = self.content_index
+        if content_index is not None:
+            filename = content_index.lookup(data, image) or filename
+
+        record = self.feature_store.get(filename)
+        if record is not None:
+            row = record.as_dict()
+            result["source"] = "dataset"
+            result["prediction"] = self.predict_sickle_cell(filename)
+        elif cnn is not None:
+            # Image isn't in the dataset: the CNN classifies the image itself. There are no
+            # features, so there is nothing to evaluate or treat.
+            result["source"] = "cnn"
+            result["prediction"] = cnn.predict([image])[0]
+            return result
+        elif not CLASSIFY_MEASURED:
+            result["quality"] = "not_in_dataset"
+            return result
+        else:
+            # Image isn't in the dataset: measure its cells and classify them with the trained model
+            row = load_backend("cell_morphology").analyze_smear(image)
+            result["source"] = "measured"
+            if row["Total RBCs (in millions)"] <= 0:
+                result["quality"] = "no_cells"
+                return result
+            result["prediction"] = self.classify_features(row)
+
+        # Classify the image itself with the CNN when that mode is selected
+        if cnn is not None:
+            result["prediction"] = cnn.predict([image])[0]
+
+        result["features"] = {feature: row[feature] for feature in FEATURES}
+        result["sickle_cell_detected"], result["reasons"] = evaluate_sickle_cell(row)
+        if result["sickle_cell_detected"]:
+            result["treatment"], result["precaution"] = choose_treatment(row)
+        return result
+
+    # Function to predict many images at once (see batch_predict.predict_batch)
+    def predict_batch(self, images, use_cnn=False):
+        return predict_batch(images, self.feature_store, self.clf, self.content_index, use_cnn=use_cnn)
+
+
+# Function to load the engine once per process
+def load_engine(feature_paths=None, shared_features_dir=None):
+    feature_paths = [columnar_path(path) for path in (feature_paths or DEFAULT_FEATURE_PATHS)]
+    return cached_resource(("engine", tuple(feature_paths), shared_features_dir), None,
+                           lambda: PredictionEngine(feature_paths, shared_features_dir))
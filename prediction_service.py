@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import os
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from lazy_imports import load_backend
+
+# Default port of the prediction service
+DEFAULT_PORT = 8600
+
+# Engine loaded in each worker process (set by _init_worker)
+_engine = None
+
+
+# Function run once in every worker process: load the engine so requests don't pay for it
+def _init_worker(feature_paths, shared_features_dir):
+    global _engine
+    _engine = load_backend("prediction_engine").load_engine(feature_paths, shared_features_dir)
+
+
+def _predict(name, data, use_cnn):
+    return _engine.predict(name, data, use_cnn)
+
+
+def _predict_batch(images, use_cnn):
+    # to_json turns the NaN of unmeasured features into null
+    return json.loads(_engine.predict_batch(images, use_cnn).to_json(orient="records"))
+
+
+# Function to create the aiohttp application; CPU-bound work runs in a process pool
+#   POST /predict?name=<file name>&cnn=1   body: the image bytes
+#   POST /predict/batch?cnn=1              body: multipart form with one part per image
+#   GET  /health                           {"status": "ok", "cnn": whether cnn=1 can be served}
+# cnn=1 is answered with 409 while the CNN hasn't been exported
+def create_app(workers=None, feature_paths=None, shared_features_dir=None):
+    web = load_backend("aiohttp.web")
+    cnn_model_path = load_backend("cnn_model").CNN_MODEL_PATH
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                               initargs=(feature_paths, shared_features_dir))
+
+    # Function to return the error response for a cnn=1 request the service can't serve, or None
+    def cnn_unavailable(use_cnn):
+        if use_cnn and not os.path.exists(cnn_model_path):
+            return web.json_response({"error": "The CNN model has not been exported (run cnn_model.py first)"},
+                                     status=409)
+        return None
+
+    async def predict(request):
+        name = request.query.get("name", "upload")
+        use_cnn = request.query.get("cnn") == "1"
+        error = cnn_unavailable(use_cnn)
+        if error is not None:
+            return error
+        data = await request.read()
+        result = await asyncio.get_running_loop().run_in_executor(pool, _predict, name, data, use_cnn)
+        return web.json_response(result)
+
+    async def predict_batch(request):
+        use_cnn = request.query.get("cnn") == "1"
+        error = cnn_unavailable(use_cnn)
+        if error is not None:
+            return error
+        images = []
+        reader = await request.multipart()
+        async for part in reader:
+            images.append((part.filename or part.name, await part.read()))
+        results = await asyncio.get_running_loop().run_in_executor(pool, _predict_batch, images, use_cnn)
+        return web.json_response(results)
+
+    async def health(request):
+        return web.json_response({"status": "ok", "cnn": os.path.exists(cnn_model_path)})
+
+    async def shutdown(app):
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    app = web.Application(client_max_size=256 * 1024 * 1024)
+    app.add_routes([web.post("/predict", predict), web.post("/predict/batch", predict_batch),
+                    web.get("/health", health)])
+    app.on_cleanup.append(shutdown)
+    return app
+
+
+# Function for clients to check the service and which prediction modes it offers (see /health)
+def request_health(service_url, timeout=5):
+    with urllib.request.urlopen(f"{service_url.rstrip('/')}/health", timeout=timeout) as response:
+        return json.load(response)
+
+
+# Function for clients (the Streamlit page, LIMS scripts) to predict one image on the service
+def request_prediction(service_url, name, data, use_cnn=False, timeout=60):
+    query = urllib.parse.urlencode({"name": name, "cnn": int(use_cnn)})
+    request = urllib.request.Request(f"{service_url.rstrip('/')}/predict?{query}", data=data, method="POST",
+                                     headers={"Content-Type": "application/octet-stream"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)
+
+
+# Function for clients to predict many images on the service; images is a list of (name, bytes) pairs
+def request_batch_prediction(service_url, images, use_cnn=False, timeout=600):
+    boundary = uuid.uuid4().hex
+    body = bytearray()
+    for position, (name, data) in enumerate(images):
+        body += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"image{position}\"; "
+                 f"filename=\"{name}\"\r\nContent-Type: application/octet-stream\r\n\r\n").encode()
+        body += data + b"\r\n"
+    body += f"--{boundary}--\r\n".encode()
+    request = urllib.request.Request(f"{service_url.rstrip('/')}/predict/batch?cnn={int(use_cnn)}", data=bytes(body),
+                                     method="POST", headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)
+
+
+if __name__ == "__main__":
+    # Usage: python prediction_service.py [--port 8600] [--workers N] [--shared-features <folder>]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="inference processes (default: every core)")
+    parser.add_argument("--shared-features", default=None, help="folder exported with feature_store.py --mmap")
+    args = parser.parse_args()
+
+    load_backend("aiohttp.web").run_app(create_app(args.workers, shared_features_dir=args.shared_features),
+                                        host=args.host, port=args.port)
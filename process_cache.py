@@ -0,0 +1,26 @@
+import threading
+
+# Resources already loaded in this process, shared by every Streamlit session: key -> (stamp, resource)
+_resources = {}
+# One lock per key, so a slow load (training a model) doesn't hold up loads of other resources
+_key_locks = {}
+_lock = threading.Lock()
+
+
+# Function to return the resource cached under key, calling factory() to create it the first time
+# and again whenever stamp differs from the stamp it was created with
+#   key:   hashable, starting with a name for the kind of resource, e.g. ("model", fingerprint)
+#   stamp: anything that changes when the resource's files change (mtimes, sizes), or None
+def cached_resource(key, stamp, factory):
+    cached = _resources.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        cached = _resources.get(key)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, factory())
+            _resources[key] = cached
+    return cached[1]
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+
+from content_index import content_hash
+from process_cache import cached_resource
+
+# Default limits of the prediction result cache
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_BYTES = 64 * 1024 * 1024
+RESULT_CACHE_TTL = 60 * 60  # seconds
+
+
+# Least-recently-used cache bounded by number of entries, total bytes and age
+class ResultCache:
+    def __init__(self, max_entries=RESULT_CACHE_ENTRIES, max_bytes=RESULT_CACHE_BYTES, ttl=RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expiry time, size in bytes, value), oldest first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Function to return the cached value for key, or None when it is missing or expired
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    # Function to store a value of the given size, evicting the least recently used entries
+    def put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, size, value)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key):
+        self.total_bytes -= self.entries.pop(key)[1]
+
+
+# Function to build the cache key of a prediction: the image content, the uploaded filename (the
+# prediction falls back to it when the content index doesn't know the image), the mode and the
+# version of the files the prediction was made with
+def prediction_key(data, name, use_cnn, version):
+    return (content_hash(data), name, use_cnn, version)
+
+
+# Function to get a named cache, created once per process
+def load_result_cache(name="predictions", max_entries=RESULT_CACHE_ENTRIES, max_bytes=RESULT_CACHE_BYTES,
+                      ttl=RESULT_CACHE_TTL):
+    return cached_resource(("result_cache", name), None, lambda: ResultCache(max_entries, max_bytes, ttl))
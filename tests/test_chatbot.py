@@ -0,0 +1,48 @@
+import os
+import random
+import sys
+
+# Make the shared modules in the project folder importable from the tests folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot import FALLBACK_RESPONSE, INTENTS, generate_response
+
+# Keywords of the if/elif chain the pages used before the matcher, in the order it tested them
+LADDER_KEYWORDS = ["care", "symptoms", "predict", "treatment", "precaution", "causes", "complications",
+                   "genetics", "diet", "exercise", "screening", "how to use this system", "platform",
+                   "mental health", "support groups", "vaccinations", "childbirth", "travel tips",
+                   "pain management", "school and work", "emergency"]
+
+RESPONSES = {keyword: response for keywords, response in INTENTS for keyword in keywords}
+
+
+# The old chain, kept as the reference: the response of the first keyword found anywhere in the question
+def ladder_response(query):
+    for keyword in LADDER_KEYWORDS:
+        if keyword in query.lower():
+            return RESPONSES[keyword]
+    return FALLBACK_RESPONSE
+
+
+# Random questions mixing keywords, pieces of keywords, filler words and run-together words
+def random_queries(count, seed=0):
+    rng = random.Random(seed)
+    fillers = ["what", "is", "the", "for", "sickle", "cell", "how", "are", "pain", "school", "support",
+               "travel", "mental", "use", "this", "system", "car", "cause", "diets", "emergencies", "?"]
+    pieces = LADDER_KEYWORDS + [keyword[:rng.randint(1, len(keyword))] for keyword in LADDER_KEYWORDS] + fillers
+    queries = []
+    for _ in range(count):
+        words = [rng.choice(pieces) for _ in range(rng.randint(0, 6))]
+        words = [word.upper() if rng.random() < 0.1 else word for word in words]
+        queries.append(rng.choice([" ", "", "-"]).join(words))
+    return queries
+
+
+def test_keyword_matcher_matches_ladder():
+    for query in random_queries(20000):
+        assert generate_response(query, retrieval=False) == ladder_response(query), query
+
+
+def test_every_keyword_answers_its_intent():
+    for keyword in LADDER_KEYWORDS:
+        assert generate_response(f"Tell me about {keyword}", retrieval=False) == RESPONSES[keyword]
@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+# Make the shared modules in the project folder importable from the tests folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_registry import FEATURES
+from prediction_engine import PredictionEngine
+from result_cache import ResultCache, prediction_key
+
+
+# A sharp, bright image that passes the quality check and isn't in the content index
+def upload_bytes():
+    pixels = np.random.default_rng(0).integers(60, 256, size=(200, 200, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+# The page's flow: answer from the cache, or predict and cache the result
+def cached_predict(cache, engine, name, data):
+    key = prediction_key(data, name, False, engine.version())
+    result = cache.get(key)
+    if result is None:
+        result = engine.predict(name, data)
+        cache.put(key, result, 1)
+    return result
+
+
+def test_same_bytes_under_another_name_are_predicted_again(tmp_path):
+    features_path = str(tmp_path / "features.csv")
+    pd.DataFrame([{"Filename": "Clear_original_1.jpg", "Total RBCs (in millions)": 4.5,
+                   **{feature: 20.0 for feature in FEATURES}, "Anisocytosis Severity": "Mild",
+                   "Sickle Cell": "YES"}]).to_csv(features_path, index=False)
+    engine = PredictionEngine([features_path])
+    cache = ResultCache()
+    data = upload_bytes()
+
+    # Unknown content falls back to the uploaded filename, so the name decides the result
+    assert cached_predict(cache, engine, "random.png", data)["quality"] == "not_in_dataset"
+    result = cached_predict(cache, engine, "Clear_original_1.jpg", data)
+    assert result["quality"] == "ok"
+    assert result["prediction"] == "SICKLE CELL"
+    assert cached_predict(cache, engine, "random.png", data)["quality"] == "not_in_dataset"
+    assert cache.hits == 1
+
+
+def test_prediction_key():
+    data = upload_bytes()
+    assert prediction_key(data, "a.png", False, None) == prediction_key(data, "a.png", False, None)
+    assert prediction_key(data, "a.png", False, None) != prediction_key(data, "b.png", False, None)
+    assert prediction_key(data, "a.png", False, None) != prediction_key(data, "a.png", True, None)
+    assert prediction_key(data, "a.png", False, None) != prediction_key(data + b"\0", "a.png", False, None)
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Make the shared modules in the project folder importable from the tests folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_registry import FEATURES
+from treatment_rules import TREATMENT_RULES, choose_treatment, evaluate_sickle_cell, score_cohort
+
+
+# The if/elif ladders the prediction page used before the rule table, kept as the reference
+def ladder_evaluate(data):
+    reasons = []
+    if data["Sickled Cells (%)"] >= 5:
+        reasons.append("Sickled Cells Percentage is high")
+    if data["Target Cells (%)"] <= 15:
+        reasons.append("Target Cells Percentage is low")
+    if data["Normocytes (%)"] <= 80:
+        reasons.append("Normocytes Percentage is low")
+    if data["Reticulocytes (%)"] >= 10:
+        reasons.append("Reticulocytes Percentage is high")
+    return bool(reasons), reasons
+
+
+def ladder_treatment_rule(row):
+    sickled_cells = row['Sickled Cells (%)']
+    target_cells = row['Target Cells (%)']
+    normocytes = row['Normocytes (%)']
+    reticulocytes = row['Reticulocytes (%)']
+    if sickled_cells >= 10:
+        return 0
+    elif target_cells <= 5:
+        return 1
+    elif normocytes <= 70:
+        return 2
+    elif reticulocytes >= 15:
+        return 3
+    elif sickled_cells <= 5:
+        return 4
+    elif target_cells >= 25:
+        return 5
+    elif normocytes >= 90:
+        return 6
+    elif reticulocytes <= 5:
+        return 7
+    return None
+
+
+def ladder_treatment(row):
+    rule = ladder_treatment_rule(row)
+    return (None, None) if rule is None else tuple(TREATMENT_RULES[rule][3:])
+
+
+# Random cohort: whole percentages (so every threshold is hit exactly), values just around the
+# thresholds, and some missing values
+@pytest.fixture(scope="module")
+def cohort():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 101, size=(20000, len(FEATURES))).astype(np.float64)
+    near = rng.random(values.shape) < 0.1
+    values[near] = rng.choice([4.99, 5.01, 9.99, 10.01, 14.99, 15.01, 69.99, 70.01, 80.01, 89.99], size=near.sum())
+    values[rng.random(values.shape) < 0.01] = np.nan
+    return pd.DataFrame(values, columns=FEATURES)
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def test_score_cohort_matches_ladders(cohort):
+    scored = score_cohort(cohort)
+    for position, row in enumerate(cohort.to_dict("records")):
+        detected, reasons = ladder_evaluate(row)
+        treatment, precaution = ladder_treatment(row) if detected else (None, None)
+        assert scored["Sickle Cell Detected"].iloc[position] == detected
+        assert scored["Reasons"].iloc[position] == "; ".join(reasons)
+        for column, expected in (("Treatment", treatment), ("Precaution", precaution)):
+            value = scored[column].iloc[position]
+            assert (_missing(value) and expected is None) or value == expected
+
+
+def test_row_functions_match_ladders(cohort):
+    for row in cohort.head(2000).to_dict("records"):
+        assert evaluate_sickle_cell(row) == ladder_evaluate(row)
+        assert tuple(choose_treatment(row)) == ladder_treatment(row)
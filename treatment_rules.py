@@ -0,0 +1,140 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from feature_store import read_feature_table
+from model_registry import FEATURES
+
+# Rules that flag sickle cell disease; every matching rule adds its reason
+#   (feature, operator, threshold, reason)
+DETECTION_RULES = [
+    ("Sickled Cells (%)", ">=", 5, "Sickled Cells Percentage is high"),
+    ("Target Cells (%)", "<=", 15, "Target Cells Percentage is low"),
+    ("Normocytes (%)", "<=", 80, "Normocytes Percentage is low"),
+    ("Reticulocytes (%)", ">=", 10, "Reticulocytes Percentage is high"),
+]
+
+# Rules that choose the treatment and precautions; the first matching rule wins
+#   (feature, operator, threshold, treatment, precaution)
+TREATMENT_RULES = [
+    ("Sickled Cells (%)", ">=", 10,
+     "Hydroxyurea, Blood Transfusions, Pain Management,Hydroxyurea ,Blood Transfusions,Bone Marrow,Antioxidants , Folic Acid",
+     "Avoid cold temperatures, maintain hydration, and avoid infections."),
+    ("Target Cells (%)", "<=", 5,
+     "Regular Monitoring, Blood Transfusions,Supplementation with folic acid and Vitamin B12.",
+     "Avoid high-altitude areas , extreme exertion, avoid dehydration ,Avoid Stress,Stay Hydrated."),
+    ("Normocytes (%)", "<=", 70,
+     "Bone Marrow Transplant in severe cases ,Routine medical checkups for early detection,Acute Pain Crisis Treatment,Hydroxyurea to Decrease Hospitalizations,Antibiotics for Respiratory Tract Infections",
+     "Stay away from stressful conditions."),
+    ("Reticulocytes (%)", ">=", 15,
+     "Hydroxyurea and Reticulocyte reduction medication,Hydroxyurea,Blood Transfusions,Bone Marrow,Antioxidants",
+     "Stay well-hydrated, avoid dehydration "),
+    ("Sickled Cells (%)", "<=", 5,
+     "Use of Antioxidants to improve red blood cell health,Vitamin D Supplementation,Regular Monitoring of Blood Cell Count,Stem Cell Transplantation",
+     "Monitor for signs of infection and fatigue, maintain hydration,avoid infections."),
+    ("Target Cells (%)", ">=", 25,
+     "Supplementation with folic acid and Vitamin B12.",
+     "Avoid smoking and alcohol consumption,Prevent Injury to Joints and Bones,Keep Emergency Contact Information Available,Avoid Excessive Physical Contact"),
+    ("Normocytes (%)", ">=", 90,
+     "Routine medical checkups for early detection,Folic Acid Supplementation,Iron Supplements,Routine Blood Tests",
+     "Maintain a healthy diet and exercise regularly,Avoid Excessive Cold Weather Exposure,Be Cautious When Taking Medications,Avoid Being Overly Stressed"),
+    ("Reticulocytes (%)", "<=", 5,
+     "Regular blood testing and iron supplementation.",
+     "Avoid high-stress situations and extreme weather,Use Supportive Footwear for Comfort,Avoid Triggers for Fatigue,Use Oxygen Therapy as Recommended"),
+]
+
+# Comparison operators allowed in the rules
+OPERATORS = {">=": np.greater_equal, "<=": np.less_equal, ">": np.greater, "<": np.less}
+
+
+# Rule table compiled into arrays, so every rule is checked on every row in one vectorized pass
+class CompiledRules:
+    def __init__(self, rules):
+        for feature, operator, *_ in rules:
+            if feature not in FEATURES:
+                raise ValueError(f"Unknown feature in rule: {feature}")
+            if operator not in OPERATORS:
+                raise ValueError(f"Unknown operator in rule: {operator}")
+        self.columns = np.array([FEATURES.index(rule[0]) for rule in rules])
+        self.thresholds = np.array([rule[2] for rule in rules], dtype=np.float64)
+        # Rules of each operator: (operator function, positions of its rules)
+        self.groups = [(function, np.array([position for position, rule in enumerate(rules) if rule[1] == operator]))
+                       for operator, function in OPERATORS.items() if any(rule[1] == operator for rule in rules)]
+        self.outcomes = [rule[3:] for rule in rules]
+
+    # Function to return the N x rules boolean matrix of matching rules for an N x FEATURES matrix
+    # (missing values match no rule)
+    def masks(self, values):
+        selected = values[:, self.columns]
+        matched = np.zeros(selected.shape, dtype=bool)
+        for function, positions in self.groups:
+            matched[:, positions] = function(selected[:, positions], self.thresholds[positions])
+        return matched
+
+
+DETECTION = CompiledRules(DETECTION_RULES)
+TREATMENT = CompiledRules(TREATMENT_RULES)
+
+
+# Function to turn feature rows (DataFrame, or a list of dicts) into an N x FEATURES float matrix
+def _feature_matrix(rows):
+    if isinstance(rows, pd.DataFrame):
+        return rows[FEATURES].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    return np.array([[row[feature] for feature in FEATURES] for row in rows], dtype=np.float64)
+
+
+# Function to score a whole cohort in one pass
+# Returns one row per input row: Sickle Cell Detected, Reasons (joined with "; "), Treatment, Precaution
+# (Treatment and Precaution are missing when the disease isn't detected or no treatment rule applies)
+def score_cohort(rows):
+    values = _feature_matrix(rows)
+    detected = DETECTION.masks(values)
+    treatments = TREATMENT.masks(values)
+
+    # Each combination of matching detection rules is a bit pattern with a precomputed reasons text
+    patterns = detected @ (1 << np.arange(detected.shape[1]))
+    reasons = np.array(["; ".join(DETECTION.outcomes[position][0] for position in range(detected.shape[1])
+                                  if pattern >> position & 1)
+                        for pattern in range(1 << detected.shape[1])], dtype=object)
+
+    is_detected = detected.any(axis=1)
+    has_treatment = is_detected & treatments.any(axis=1)
+    first_treatment = treatments.argmax(axis=1)
+    outcomes = np.array(TREATMENT.outcomes + [(None, None)], dtype=object)
+    chosen = outcomes[np.where(has_treatment, first_treatment, len(TREATMENT.outcomes))]
+
+    return pd.DataFrame({
+        "Sickle Cell Detected": is_detected,
+        "Reasons": reasons[patterns],
+        "Treatment": chosen[:, 0],
+        "Precaution": chosen[:, 1],
+    }, index=rows.index if isinstance(rows, pd.DataFrame) else None)
+
+
+# Function to evaluate sickle cell anemia based on feature thresholds
+def evaluate_sickle_cell(data):
+    detected = DETECTION.masks(_feature_matrix([data]))[0]
+    return bool(detected.any()), [DETECTION.outcomes[position][0] for position in np.flatnonzero(detected)]
+
+
+# Function to choose the treatment and precautions based on feature values
+# Returns (None, None) when no rule applies
+def choose_treatment(row):
+    matched = TREATMENT.masks(_feature_matrix([row]))[0]
+    if not matched.any():
+        return None, None
+    return TREATMENT.outcomes[matched.argmax()]
+
+
+if __name__ == "__main__":
+    # Usage: python treatment_rules.py <feature CSV or Parquet> [--output scored.csv]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("features")
+    parser.add_argument("--output", default="scored_cohort.csv")
+    args = parser.parse_args()
+
+    cohort = read_feature_table(args.features)
+    scored = pd.concat([cohort, score_cohort(cohort)], axis=1)
+    scored.to_csv(args.output, index=False)
+    print(f"{int(scored['Sickle Cell Detected'].sum())} of {len(scored)} rows flagged, saved as {args.output}")